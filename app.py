@@ -1,10 +1,396 @@
-from flask import Flask, render_template, jsonify
+from flask import Flask, Response, abort, jsonify, render_template, request
 from flask_cors import CORS
+from werkzeug.exceptions import ServiceUnavailable
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+import contextlib
+import csv
+import functools
+import gzip
+import hashlib
+import io
+import json
 import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from projeeeeeeect import InstructorRole, SolutionStore, WebTimetableCSP
 
 app = Flask(__name__)
 CORS(app)
 
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Timetable left by the last `python projeeeeeeect.py` run; reused instead of solving from scratch
+STATE_PATH = os.path.join(BASE_DIR, "timetable_state.json")
+# Earlier solution versions kept readable through ?version=, so a page never mixes two timetables
+KEEP_VERSIONS = 4
+# Solve jobs are recorded in SQLite, so every web worker can report on them, and run in a process pool
+JOBS_DB = os.path.join(BASE_DIR, "solve_jobs.sqlite3")
+SOLVE_WORKERS = int(os.environ.get("SOLVE_WORKERS", 2))
+# Finished jobs, payload included, are kept for JOB_RETENTION_DAYS and at most KEEP_JOBS of them
+JOB_RETENTION_SECONDS = float(os.environ.get("JOB_RETENTION_DAYS", 7)) * 86400
+KEEP_JOBS = int(os.environ.get("KEEP_JOBS", 100))
+# POST /api/solve options and their types
+SOLVE_OPTIONS = {"solver": str, "time_limit": float, "restarts": int, "workers": int, "seed": int, "improve": float,
+                 "preferences": str, "publish": bool, "fresh": bool}
+# Caps on those options, so one request cannot hold a SOLVE_WORKERS process or the CPUs for good;
+# seed is handed to CP-SAT's random_seed, a 32-bit int
+MAX_SOLVE_SECONDS = float(os.environ.get("MAX_SOLVE_SECONDS", 600))
+MAX_RESTARTS = int(os.environ.get("MAX_RESTARTS", 256))
+MAX_WORKERS = os.cpu_count() or 1
+MAX_SEED = 2**31 - 1
+# How often a web worker looks in the jobs DB for a timetable published by a job in another worker
+PUBLISHED_CHECK_SECONDS = 1.0
+# Retry-After of the 503 served while a worker's first timetable is solved in the background
+SOLVING_RETRY_SECONDS = 5
+# Solutions shared with the CLI and every worker: the same input, seed and options are solved once
+SOLUTION_CACHE = os.path.join(BASE_DIR, ".solution_cache.sqlite3")
+SOLUTION_CACHE_BYTES = int(float(os.environ.get("SOLUTION_CACHE_MB", 64)) * 2**20)
+# cpu, memory or all: run this process's solve under cProfile/tracemalloc, reported by /api/metrics
+PROFILE = os.environ.get("TIMETABLE_PROFILE")
+
+
+class Solution:
+    """One solved timetable, with every API body cut from it serialised and gzipped once."""
+
+    def __init__(self, version: str, payload: dict, metrics: dict = None):
+        self.version = version
+        # When any worker first published this version (see publish), so Last-Modified agrees across them
+        self.created = datetime.now(timezone.utc).replace(microsecond=0)
+        # Whether this process's solve came from the solution cache says nothing about the version
+        self.payload = {**payload, "meta": {k: v for k, v in payload.get("meta", {}).items() if k != "from_cache"}}
+        # WebTimetableCSP.metrics() of the solve, when it ran in a process that kept them
+        self.metrics = metrics
+        self.by_section, self.by_instructor, self.by_room = {}, {}, {}
+        p = self.payload
+        for row in p["assignments"]:
+            self.by_section.setdefault(p["sections"][row[0]][0], []).append(row)
+            self.by_instructor.setdefault(p["instructors"][row[2]][0], []).append(row)
+            self.by_room.setdefault(p["rooms"][row[3]][0], []).append(row)
+        self._bodies = {}
+
+    def body(self, key, build):
+        # (raw bytes, gzipped bytes, etag) for one endpoint; racing builders produce the same value.
+        # The etag names the version and endpoint rather than the bytes, so every web worker
+        # serving this version hands out the same one
+        cached = self._bodies.get(key)
+        if cached is None:
+            raw = json.dumps(build(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            etag = hashlib.sha1(json.dumps([self.version, key]).encode("utf-8")).hexdigest()
+            cached = self._bodies[key] = (raw, gzip.compress(raw), etag)
+        return cached
+
+    def expand(self, rows):
+        p = self.payload
+        return [{
+            "section": p["sections"][s][0],
+            "course": p["courses"][c][0],
+            "course_name": p["courses"][c][1],
+            "instructor": p["instructors"][i][0],
+            "instructor_name": p["instructors"][i][1],
+            "room": p["rooms"][r][0],
+            "day": p["days"][p["slots"][t][0]],
+            "start": p["slots"][t][1],
+            "end": p["slots"][t][2],
+            "type": p["types"][k],
+        } for s, c, i, r, t, k in rows]
+
+
+_solutions = OrderedDict()
+_current = None
+_publish_lock = threading.Lock()
+_solve_lock = threading.Lock()
+_solving = None
+_published_checked = 0.0
+
+
+def publish(solution: Solution, current: bool = True) -> Solution:
+    """Cache a solution by version, by default also serving it from now on.
+
+    The last KEEP_VERSIONS versions stay readable through ?version=.
+    """
+    global _current
+    with contextlib.closing(jobs_db()) as db, db:
+        db.execute("INSERT OR IGNORE INTO versions (version, created) VALUES (?, ?)",
+                   (solution.version, solution.created.timestamp()))
+        created, = db.execute("SELECT created FROM versions WHERE version = ?", (solution.version,)).fetchone()
+    solution.created = datetime.fromtimestamp(created, timezone.utc)
+    with _publish_lock:
+        _solutions[solution.version] = solution
+        _solutions.move_to_end(solution.version)
+        while len(_solutions) > KEEP_VERSIONS:
+            _solutions.popitem(last=False)
+        if current:
+            _current = solution
+    return solution
+
+
+def solve_current():
+    # Background thread of current_solution: solve this process's timetable from the input files
+    global _solving
+    try:
+        system = WebTimetableCSP()
+        system.solution_store = SolutionStore(SOLUTION_CACHE, SOLUTION_CACHE_BYTES)
+        if PROFILE:
+            system.enable_profiling(cpu=PROFILE in ("cpu", "all"), memory=PROFILE in ("memory", "all"))
+        system.load_data()
+        if os.path.exists(STATE_PATH):
+            system.generate_timetable_incremental(STATE_PATH)
+        else:
+            system.generate_timetable()
+        publish(Solution(system.solution_version(), system.payload(), system.metrics()))
+    except Exception:
+        app.logger.exception("solving the timetable failed; the next request retries")
+    finally:
+        with _solve_lock:
+            _solving = None
+
+
+def check_published():
+    # Serve the timetable a job last published, in whichever worker it ran
+    global _published_checked
+    now = time.monotonic()
+    if now - _published_checked >= PUBLISHED_CHECK_SECONDS:
+        _published_checked = now
+        with contextlib.closing(jobs_db()) as db:
+            row = db.execute("SELECT version, job_id FROM published ORDER BY at DESC LIMIT 1").fetchone()
+            if row is not None and (_current is None or _current.version != row[0]):
+                solution = _solutions.get(row[0])
+                if solution is None:
+                    result, progress = db.execute("SELECT result, progress FROM jobs WHERE id = ?",
+                                                  (row[1],)).fetchone()
+                    solution = Solution(row[0], json.loads(result), json.loads(progress).get("metrics"))
+                publish(solution)
+
+
+def current_solution() -> Solution:
+    # The published timetable, else this process's own, solved once in the background: reads
+    # never solve, they get a 503 with Retry-After until a timetable exists
+    global _solving
+    check_published()
+    if _current is None:
+        with _solve_lock:
+            if _current is None and _solving is None:
+                _solving = threading.Thread(target=solve_current, name="solve-current", daemon=True)
+                _solving.start()
+        if _current is None:
+            raise ServiceUnavailable("the timetable is being solved", retry_after=SOLVING_RETRY_SECONDS)
+    return _current
+
+
+def requested_solution() -> Solution:
+    version = request.args.get("version")
+    if version is None:
+        return current_solution()
+    solution = _solutions.get(version)
+    if solution is None:
+        # A what-if solve finished by a job, possibly in another web worker
+        with contextlib.closing(jobs_db()) as db:
+            row = db.execute("SELECT result FROM jobs WHERE version = ? AND result IS NOT NULL", (version,)).fetchone()
+        if row is None:
+            abort(404, description=f"timetable version {version} is no longer cached")
+        solution = publish(Solution(version, json.loads(row[0])), current=False)
+    return solution
+
+
+def jobs_db():
+    db = sqlite3.connect(JOBS_DB, timeout=30)
+    db.execute("""CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY, status TEXT, options TEXT, progress TEXT,
+        submitted REAL, started REAL, finished REAL, version TEXT, result TEXT, error TEXT)""")
+    # Versions published by jobs, newest last; every web worker serves the newest
+    db.execute("CREATE TABLE IF NOT EXISTS published (version TEXT, job_id TEXT, at REAL)")
+    # When each version was first published, its Last-Modified in every worker
+    db.execute("CREATE TABLE IF NOT EXISTS versions (version TEXT PRIMARY KEY, created REAL)")
+    return db
+
+
+def prune_jobs(db):
+    # Keep the last KEEP_VERSIONS publications, and finished jobs within both retention limits;
+    # a job whose timetable is still published is kept regardless
+    db.execute("DELETE FROM published WHERE rowid NOT IN "
+               "(SELECT rowid FROM published ORDER BY at DESC LIMIT ?)", (KEEP_VERSIONS,))
+    db.execute("""DELETE FROM jobs WHERE status IN ('done', 'failed')
+        AND id NOT IN (SELECT job_id FROM published)
+        AND (finished < ? OR id NOT IN (SELECT id FROM jobs WHERE status IN ('done', 'failed')
+                                        ORDER BY finished DESC LIMIT ?))""",
+               (time.time() - JOB_RETENTION_SECONDS, KEEP_JOBS))
+    db.execute("DELETE FROM versions WHERE created < ? AND version NOT IN (SELECT version FROM published) "
+               "AND version NOT IN (SELECT version FROM jobs WHERE version IS NOT NULL)",
+               (time.time() - JOB_RETENTION_SECONDS,))
+
+
+def update_job(job_id: str, **fields):
+    with contextlib.closing(jobs_db()) as db, db:
+        db.execute(f"UPDATE jobs SET {', '.join(f'{name} = ?' for name in fields)} WHERE id = ?",
+                   [*fields.values(), job_id])
+
+
+def record_progress(job_id: str, progress: dict):
+    update_job(job_id, progress=json.dumps(progress))
+
+
+def run_solve_job(job_id: str, options: dict):
+    # Runs in a pool process: solve from the input files and store the payload with the job
+    update_job(job_id, status="running", started=time.time())
+    try:
+        system = WebTimetableCSP(preference_mode=options.get("preferences", "soft"))
+        system.solution_store = SolutionStore(SOLUTION_CACHE, SOLUTION_CACHE_BYTES, reuse=not options.get("fresh"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            system.load_data()
+            system.progress_callback = functools.partial(record_progress, job_id)
+            system.generate_timetable(solver=options.get("solver", "greedy"),
+                                      time_limit=options.get("time_limit", 60.0),
+                                      restarts=options.get("restarts", 8), workers=options.get("workers"),
+                                      seed=options.get("seed", 0))
+            if options.get("improve"):
+                system.improve_timetable(time_limit=options["improve"], seed=options.get("seed", 0))
+        progress = {"phase": "done", "placed": len(system.assignments),
+                    "required": len(system._required_sessions()), "cost": system.soft_penalty(),
+                    "metrics": system.metrics()}
+        version = system.solution_version()
+        update_job(job_id, status="done", finished=time.time(), progress=json.dumps(progress), version=version,
+                   result=json.dumps(system.payload(), ensure_ascii=False, separators=(",", ":")))
+        if options.get("publish"):
+            with contextlib.closing(jobs_db()) as db, db:
+                db.execute("INSERT INTO published (version, job_id, at) VALUES (?, ?, ?)", (version, job_id, time.time()))
+    except Exception as e:
+        update_job(job_id, status="failed", finished=time.time(), error=f"{type(e).__name__}: {e}")
+        raise
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def solve_pool(broken: ProcessPoolExecutor = None) -> ProcessPoolExecutor:
+    # The shared pool, replaced once a worker process died (e.g. OOM-killed) and broke it
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool is broken:
+            _pool = ProcessPoolExecutor(max_workers=SOLVE_WORKERS)
+    return _pool
+
+
+def job_done(job_id: str, pool: ProcessPoolExecutor, future):
+    # Done-callback of every job: one that raised without recording it, as when its worker
+    # process died, is marked failed, and a pool broken that way is replaced
+    error = future.exception()
+    if error is None:
+        return
+    with contextlib.closing(jobs_db()) as db, db:
+        db.execute("UPDATE jobs SET status = 'failed', finished = ?, error = ? "
+                   "WHERE id = ? AND status IN ('queued', 'running')",
+                   (time.time(), f"{type(error).__name__}: {error}", job_id))
+    if isinstance(error, BrokenProcessPool):
+        solve_pool(broken=pool)
+
+
+def publish_job(future):
+    # Done-callback of a job submitted with "publish": serve the newest published timetable from
+    # this worker at once; the others pick it up within PUBLISHED_CHECK_SECONDS
+    global _published_checked
+    if future.exception() is None:
+        _published_checked = 0.0
+        check_published()
+
+
+def send_json(solution: Solution, key, build):
+    # ETag/Last-Modified make repeat reads a 304; gzip is served to clients that accept it. The
+    # etag is weak: the payload's "generated" time differs between workers solving the same version
+    raw, packed, etag = solution.body(key, build)
+    use_gzip = "gzip" in request.accept_encodings
+    response = Response(packed if use_gzip else raw, mimetype="application/json")
+    if use_gzip:
+        response.headers["Content-Encoding"] = "gzip"
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["X-Timetable-Version"] = solution.version
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    response.set_etag(etag + ("-gzip" if use_gzip else ""), weak=True)
+    response.last_modified = solution.created
+    return response.make_conditional(request)
+
+
+def prometheus_text(solution: Solution) -> str:
+    # Prometheus text exposition of the solve's metrics, one gauge or counter per family
+    m = solution.metrics or {}
+    lines = []
+
+    def family(name, kind, help_text, samples):
+        lines.extend([f"# HELP timetable_{name} {help_text}", f"# TYPE timetable_{name} {kind}"])
+        for labels, value in samples:
+            label_text = ",".join('{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"')
+                                                   .replace("\n", "\\n")) for k, v in labels.items())
+            lines.append(f"timetable_{name}{{{label_text}}} {value}" if labels else f"timetable_{name} {value}")
+
+    meta = m.get("meta", {})
+    family("info", "gauge", "Timetable version being served, with the input and seed it was solved from.",
+           [({"version": solution.version, "input_hash": meta.get("input_hash", ""), "seed": meta.get("seed", ""),
+              "deterministic": str(meta.get("deterministic", "")).lower()}, 1)])
+    family("phase_seconds", "gauge", "Wall time of each solve phase.",
+           [({"phase": phase}, seconds) for phase, seconds in m.get("phases", {}).items()])
+    solution_stats = m.get("solution", {})
+    family("sessions", "gauge", "Sessions required and placed.",
+           [({"state": state}, solution_stats[state]) for state in ("required", "placed") if state in solution_stats])
+    family("unplaced_sessions", "gauge", "Sessions left unplaced, by blocker.",
+           [({"blocker": blocker}, n) for blocker, n in solution_stats.get("unplaced", {}).items()])
+    if solution_stats.get("soft_penalty") is not None:
+        family("soft_penalty", "gauge", "Soft-constraint penalty of the timetable.", [({}, solution_stats["soft_penalty"])])
+    checks = m.get("checks", {})
+    family("candidate_checks_total", "counter", "Instructor, room and slot candidates checked.",
+           [({}, checks.get("candidates", 0))])
+    family("rejections_total", "counter", "Candidates rejected, by first clashing constraint.",
+           [({"reason": reason}, n) for reason, n in checks.get("rejections", {}).items()])
+    family("conflict_mask_checks_total", "counter", "Occupancy masks tested for clashes.",
+           [({}, checks.get("conflict_masks", 0))])
+    candidates = m.get("candidates", {})
+    family("candidates_per_session", "gauge", "Candidates the greedy pass went through per session.",
+           [({"stat": stat}, candidates[stat]) for stat in ("mean", "max") if stat in candidates])
+    solver = m.get("solver", {})
+    family("solver_stat", "gauge", "Numeric statistics of the last solver run.",
+           [({"solver": solver.get("name"), "stat": stat}, value) for stat, value in solver.items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)])
+    peaks = m.get("profile", {}).get("memory_peaks", {})
+    if peaks:
+        family("phase_memory_peak_bytes", "gauge", "Traced memory peak of each phase.",
+               [({"phase": phase}, peak) for phase, peak in peaks.items()])
+    return "\n".join(lines) + "\n"
+
+
+def unplaced_list(solution: Solution):
+    p = solution.payload
+    return [{
+        "section": p["sections"][s][0],
+        "course": p["courses"][c][0],
+        "course_name": p["courses"][c][1],
+        "type": p["types"][k],
+        "blocker": p["blockers"][b],
+        "reason": WebTimetableCSP.UNPLACED_BLOCKERS[p["blockers"][b]],
+    } for s, c, k, b in p.get("unplaced", [])]
+
+
+def instructor_list(solution: Solution, role: InstructorRole):
+    p = solution.payload
+    role_index = p["roles"].index(role.value)
+    people = sorted((row for row in p["instructors"] if row[2] == role_index and row[1] != "Unknown Instructor"),
+                    key=lambda row: (row[1], row[0]))
+    return [{"id": iid, "name": name, "sessions": len(solution.by_instructor.get(iid, ()))}
+            for iid, name, _ in people]
+
+
+def instructor_week(solution: Solution, role: InstructorRole, iid: str):
+    p = solution.payload
+    row = next((row for row in p["instructors"] if row[0] == iid), None)
+    if row is None or p["roles"][row[2]] != role.value:
+        abort(404, description=f"no {role.value.lower()} {iid}")
+    return {"id": iid, "name": row[1], "assignments": solution.expand(solution.by_instructor.get(iid, []))}
+
+
 @app.route("/")
 def home():
     return render_template("timetable.html")
@@ -15,30 +401,170 @@ def api_ping():
     return jsonify({"status": "ok", "message": "backend reachable"})
 
 
+@app.route('/api/solve', methods=["POST"])
+def api_solve():
+    options = request.get_json(silent=True) or {}
+    for name, value in options.items():
+        kind = SOLVE_OPTIONS.get(name)
+        if kind is None:
+            abort(400, description=f"unknown option {name}")
+        # bool is an int subclass, so true/false only pass as the bool options
+        if (not isinstance(value, kind) and not (kind is float and isinstance(value, int))
+                or isinstance(value, bool) and kind is not bool):
+            abort(400, description=f"{name} must be {kind.__name__}")
+    if options.get("solver", "greedy") not in WebTimetableCSP.SOLVERS:
+        abort(400, description=f"solver must be one of {', '.join(sorted(WebTimetableCSP.SOLVERS))}")
+    if options.get("preferences", "soft") not in ("hard", "soft", "off"):
+        abort(400, description="preferences must be hard, soft or off")
+    if not 0 < options.get("time_limit", 60.0) <= MAX_SOLVE_SECONDS:
+        abort(400, description=f"time_limit must be more than 0 and at most {MAX_SOLVE_SECONDS:g} seconds")
+    if not 0 <= options.get("improve", 0.0) <= MAX_SOLVE_SECONDS:
+        abort(400, description=f"improve must be 0 to {MAX_SOLVE_SECONDS:g} seconds")
+    if not 1 <= options.get("restarts", 8) <= MAX_RESTARTS:
+        abort(400, description=f"restarts must be 1 to {MAX_RESTARTS}")
+    if not 1 <= options.get("workers", 1) <= MAX_WORKERS:
+        abort(400, description=f"workers must be 1 to {MAX_WORKERS}")
+    if not 0 <= options.get("seed", 0) <= MAX_SEED:
+        abort(400, description=f"seed must be 0 to {MAX_SEED}")
+
+    job_id = uuid.uuid4().hex
+    with contextlib.closing(jobs_db()) as db, db:
+        prune_jobs(db)
+        db.execute("INSERT INTO jobs (id, status, options, submitted) VALUES (?, 'queued', ?, ?)",
+                   (job_id, json.dumps(options), time.time()))
+    pool = solve_pool()
+    try:
+        future = pool.submit(run_solve_job, job_id, options)
+    except BrokenProcessPool:
+        pool = solve_pool(broken=pool)
+        future = pool.submit(run_solve_job, job_id, options)
+    future.add_done_callback(functools.partial(job_done, job_id, pool))
+    if options.get("publish"):
+        future.add_done_callback(publish_job)
+    response = jsonify({"id": job_id, "status": "queued"})
+    response.status_code = 202
+    response.headers["Location"] = f"/api/solve/{job_id}"
+    return response
+
+
+@app.route('/api/solve/<job_id>')
+def api_solve_status(job_id):
+    with contextlib.closing(jobs_db()) as db:
+        row = db.execute("SELECT status, options, progress, submitted, started, finished, version, error "
+                         "FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None:
+        abort(404, description=f"no solve job {job_id}")
+    status, options, progress, submitted, started, finished, version, error = row
+    response = jsonify({
+        "id": job_id, "status": status, "options": json.loads(options),
+        "progress": json.loads(progress) if progress else None,
+        "submitted": submitted, "started": started, "finished": finished,
+        "version": version, "error": error,
+    })
+    response.cache_control.no_store = True
+    return response
+
+
+@app.route('/api/metrics')
+def api_metrics():
+    solution = requested_solution()
+    response = jsonify({"version": solution.version, "metrics": solution.metrics})
+    response.cache_control.no_store = True
+    return response
+
+
+@app.route('/metrics')
+def metrics():
+    return Response(prometheus_text(current_solution()), mimetype="text/plain; version=0.0.4")
+
+
 @app.route('/api/timetable')
 def api_timetable():
-    # Minimal placeholder JSON. Replace with real data logic.
-    sample = {
-        "title": "Caleb Timetable",
-        "generated": "2026-01-26",
-        "levels": ["L1", "L2", "L3", "L4"]
-    }
-    return jsonify(sample)
+    solution = requested_solution()
+    return send_json(solution, ("timetable",), lambda: solution.payload)
+
+
+@app.route('/api/sections')
+def api_sections():
+    solution = requested_solution()
+    return send_json(solution, ("sections",), lambda: {"sections": [
+        {"id": sid, "level": level, "specialization": spec, "sessions": len(solution.by_section.get(sid, ()))}
+        for sid, level, spec in solution.payload["sections"]
+    ]})
+
+
+@app.route('/api/sections/<section_id>')
+def api_section(section_id):
+    solution = requested_solution()
+    if not any(row[0] == section_id for row in solution.payload["sections"]):
+        abort(404, description=f"no section {section_id}")
+    return send_json(solution, ("sections", section_id), lambda: {
+        "id": section_id, "assignments": solution.expand(solution.by_section.get(section_id, []))})
 
 
 @app.route('/api/assistants')
 def api_assistants():
-    return jsonify({"assistants": []})
+    solution = requested_solution()
+    return send_json(solution, ("assistants",), lambda: {
+        "assistants": instructor_list(solution, InstructorRole.ASSISTANT_PROFESSOR)})
+
+
+@app.route('/api/assistants/<instructor_id>')
+def api_assistant(instructor_id):
+    solution = requested_solution()
+    week = instructor_week(solution, InstructorRole.ASSISTANT_PROFESSOR, instructor_id)
+    return send_json(solution, ("assistants", instructor_id), lambda: week)
 
 
 @app.route('/api/professors')
 def api_professors():
-    return jsonify({"professors": []})
+    solution = requested_solution()
+    return send_json(solution, ("professors",), lambda: {
+        "professors": instructor_list(solution, InstructorRole.PROFESSOR)})
+
+
+@app.route('/api/professors/<instructor_id>')
+def api_professor(instructor_id):
+    solution = requested_solution()
+    week = instructor_week(solution, InstructorRole.PROFESSOR, instructor_id)
+    return send_json(solution, ("professors", instructor_id), lambda: week)
+
+
+@app.route('/api/unplaced')
+def api_unplaced():
+    # Sessions the solve left out and what blocks each; ?format=csv for a spreadsheet
+    solution = requested_solution()
+    if request.args.get("format") != "csv":
+        return send_json(solution, ("unplaced",), lambda: {"unplaced": unplaced_list(solution)})
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=["section", "course", "course_name", "type", "blocker", "reason"])
+    writer.writeheader()
+    writer.writerows(unplaced_list(solution))
+    response = Response(out.getvalue(), mimetype="text/csv")
+    response.headers["Content-Disposition"] = f"attachment; filename=unplaced-{solution.version[:12]}.csv"
+    response.headers["X-Timetable-Version"] = solution.version
+    response.set_etag(f"{solution.version}-unplaced-csv")
+    return response.make_conditional(request)
 
 
 @app.route('/api/rooms')
 def api_rooms():
-    return jsonify({"rooms": []})
+    solution = requested_solution()
+    return send_json(solution, ("rooms",), lambda: {"rooms": [
+        {"name": name, "building": building, "space": space, "capacity": capacity,
+         "sessions": len(solution.by_room.get(name, ()))}
+        for name, building, space, capacity in solution.payload["rooms"]
+    ]})
+
+
+@app.route('/api/rooms/<path:room_name>')
+def api_room(room_name):
+    solution = requested_solution()
+    if not any(row[0] == room_name for row in solution.payload["rooms"]):
+        abort(404, description=f"no room {room_name}")
+    return send_json(solution, ("rooms", room_name), lambda: {
+        "name": room_name, "assignments": solution.expand(solution.by_room.get(room_name, []))})
+
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
@@ -0,0 +1,276 @@
+"""Benchmark the solvers and report generators on synthetic instances.
+
+    python benchmark.py                                   # default matrix -> benchmark_results.json
+    python benchmark.py --scales 1 10 100 --tightness 0.5 0.9 --solvers greedy backtracking
+    python benchmark.py --save-baseline benchmark_baseline.json
+    python benchmark.py --baseline benchmark_baseline.json   # exit status 1 on a regression
+    python benchmark.py --generate instance/ --scale 10 --tightness 0.8
+
+An instance of scale N has N faculties shaped like the EJUST sample (levels 1-2 common, four
+specializations at levels 3-4, about 41 sections), sharing one pool of rooms and the sample's
+20-slot week. Tightness is the share of room slots and instructor slots the required sessions
+fill: rooms and qualified instructors are sized so demand / capacity is about that ratio.
+
+Every case runs in a fresh process, so its peak RSS is its own. For each phase (load, solve,
+improve, reports) the results record wall time, peak RSS so far, sessions placed and conflict
+checks (WebTimetableCSP.conflict_checks; checks made in multistart worker processes or inside
+CP-SAT are not counted).
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import math
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from projeeeeeeect import WebTimetableCSP
+
+DAYS = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday"]
+SLOT_TIMES = [("9:00 AM", "10:30 AM"), ("10:45 AM", "12:15 PM"), ("12:30 PM", "2:00 PM"), ("2:15 PM", "3:45 PM")]
+SPECIALIZATIONS = ["AID", "CNC", "CSC", "BIF"]
+# Lecture/Tutorial/Lab combinations with their frequency in courses_edited.xlsx
+COURSE_KINDS = [((True, True, True), 27), ((True, False, True), 11), ((True, False, False), 10), ((True, True, False), 3)]
+# A phase only counts as slower when it is also this many seconds slower, to ignore timer noise
+MIN_REGRESSION_SECONDS = 0.05
+
+
+def generate_instance(directory: str, scale: int = 1, tightness: float = 0.7, seed: int = 0) -> dict:
+    """Write the five input files of a synthetic instance to directory and return its sizes."""
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    slots = len(DAYS) * len(SLOT_TIMES)
+
+    courses, sections = [], []
+    for faculty in range(scale):
+        cohorts = [(level, "", f"_L{level}") for level in (1, 2)]
+        cohorts += [(level, spec, f"_{spec}_L{level}") for level in (3, 4) for spec in SPECIALIZATIONS]
+        for level, spec, suffix in cohorts:
+            prefix = spec or rng.choice(SPECIALIZATIONS + ["MTH", "PHY", "LRA"])
+            cohort_courses = []
+            for _ in range(rng.randint(5, 7)):
+                cid = f"{prefix}{faculty:03d}{level}{len(courses) % 100:02d}"
+                kind = rng.choices([kind for kind, _ in COURSE_KINDS], [w for _, w in COURSE_KINDS])[0]
+                courses.append((cid, f"Synthetic Course {len(courses)}", rng.randint(1, 3), *kind))
+                cohort_courses.append(cid)
+            for n in range(rng.randint(2, 6)):
+                sections.append((f"S{n + 1}{suffix}_F{faculty}", rng.randint(15, 25), cohort_courses))
+
+    # Sessions each course needs per role, and per room kind
+    course_flags = {cid: (lec, tut, lab) for cid, _, _, lec, tut, lab in courses}
+    demand = {"Professor": {}, "Assistant Professor": {}}
+    lecture_sessions = small_room_sessions = 0
+    for _, _, taken in sections:
+        for cid in taken:
+            lec, tut, lab = course_flags[cid]
+            demand["Professor"][cid] = demand["Professor"].get(cid, 0) + lec
+            demand["Assistant Professor"][cid] = demand["Assistant Professor"].get(cid, 0) + tut + lab
+            lecture_sessions += lec
+            small_room_sessions += tut + lab
+
+    # Qualify the least-loaded instructors for each course until none expects more than its share
+    instructors = []
+    share = slots * tightness
+    for role, prefix in (("Professor", "PROF"), ("Assistant Professor", "ASST")):
+        sessions = {cid: n for cid, n in demand[role].items() if n}
+        pool = [[0.0, f"{prefix}{k:05d}", []] for k in range(max(1, math.ceil(sum(sessions.values()) / share)))]
+        for cid, n in sorted(sessions.items(), key=lambda item: -item[1]):
+            chosen = sorted(pool, key=lambda inst: (inst[0], inst[1]))[:max(2, math.ceil(n / share))]
+            for inst in chosen:
+                inst[0] += n / len(chosen)
+                inst[2].append(cid)
+        for _, iid, qualified in pool:
+            preference = "Any time" if rng.random() < 0.6 else f"Not on {rng.choice(DAYS)}"
+            instructors.append((iid, f"Dr. Synthetic {iid}", role, preference, ",".join(qualified)))
+
+    # Lecture halls for lectures; 25-seat labs take labs and tutorials
+    rooms = []
+    for count, kind, capacities in ((math.ceil(lecture_sessions / share), "Lecture", (50, 75, 100, 150)),
+                                    (math.ceil(small_room_sessions / share), "Lab", (25,))):
+        for _ in range(max(1, count)):
+            building = f"B{len(rooms) // 12 + 1}"
+            rooms.append((building, f"F{len(rooms) % 12 // 4}.{len(rooms) % 4 + 1:02d}", rng.choice(capacities), kind))
+
+    with open(os.path.join(directory, "TimeSlots.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Day", "StartTime", "EndTime", "TimeSlotID"])
+        for d, day in enumerate(DAYS):
+            for k, (start, end) in enumerate(SLOT_TIMES):
+                writer.writerow([day, start, end, f"TS{d * len(SLOT_TIMES) + k}"])
+    with open(os.path.join(directory, "Sections.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["SectionID", "StudentCount", "Courses"])
+        writer.writerows((sid, count, ",".join(taken)) for sid, count, taken in sections)
+    with open(os.path.join(directory, "Instructor.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["InstructorID", "Name", "Role", "PreferredSlots", "QualifiedCourses"])
+        writer.writerows(instructors)
+    yes_no = {True: "Yes", False: "No"}
+    pd.DataFrame([(cid, name, credits, yes_no[lec], yes_no[tut], yes_no[lab])
+                  for cid, name, credits, lec, tut, lab in courses],
+                 columns=["CourseID", "CourseName", "Credits", "Lecture", "Tutorial", "Lab"]
+                 ).to_excel(os.path.join(directory, "courses_edited.xlsx"), index=False)
+    pd.DataFrame(rooms, columns=["Bulding", "Space", "Capacity", "Type"]
+                 ).to_excel(os.path.join(directory, "Bulding.xlsx"), index=False)
+
+    return {"sections": len(sections), "courses": len(courses), "instructors": len(instructors),
+            "rooms": len(rooms), "time_slots": slots, "sessions": lecture_sessions + small_room_sessions}
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_case(case: dict) -> dict:
+    """Run one case in the current process, from inside its instance directory."""
+    os.chdir(case["instance"])
+    system = WebTimetableCSP()
+    phases = {}
+
+    @contextlib.contextmanager
+    def phase(name):
+        checks = system.conflict_checks
+        started = time.perf_counter()
+        yield
+        phases[name] = {
+            "seconds": round(time.perf_counter() - started, 4),
+            "peak_rss_mb": _peak_rss_mb(),
+            "placed": len(system.assignments),
+            "conflict_checks": system.conflict_checks - checks,
+        }
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        with phase("load"):
+            system.load_data(cache_path=None)
+        with phase("solve"):
+            system.generate_timetable(solver=case["solver"], time_limit=case["time_limit"],
+                                      restarts=case["restarts"], seed=case["seed"])
+        if case["improve"]:
+            with phase("improve"):
+                system.improve_timetable(time_limit=case["improve"], seed=case["seed"])
+        if case["reports"]:
+            with phase("reports"):
+                system.generate_all_reports()
+    return {"required": len(system._required_sessions()), "soft_penalty": system.soft_penalty(), "phases": phases}
+
+
+def run_benchmarks(args) -> dict:
+    cases = []
+    with contextlib.ExitStack() as stack:
+        root = args.instances or stack.enter_context(tempfile.TemporaryDirectory(prefix="timetable-bench-"))
+        for scale in args.scales:
+            for tightness in args.tightness:
+                instance = os.path.join(root, f"x{scale}-t{tightness:g}-s{args.seed}")
+                sizes = generate_instance(instance, scale, tightness, args.seed)
+                for solver in args.solvers:
+                    case = {"name": f"{solver}-x{scale}-t{tightness:g}", "scale": scale, "tightness": tightness,
+                            "solver": solver, "seed": args.seed, "instance": instance,
+                            "time_limit": args.time_limit, "restarts": args.restarts,
+                            "improve": args.improve, "reports": not args.no_reports}
+                    print(f"{case['name']}: {sizes['sections']} sections, {sizes['sessions']} sessions, "
+                          f"{sizes['rooms']} rooms, {sizes['instructors']} instructors")
+                    runs = []
+                    for _ in range(args.repeat):
+                        # A fresh interpreter per run, so peak RSS and caches start from scratch
+                        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                            runs.append(pool.submit(run_case, case).result())
+                    result = runs[0]
+                    for name, timing in result["phases"].items():
+                        timing["seconds"] = min(run["phases"][name]["seconds"] for run in runs)
+                        timing["peak_rss_mb"] = min(run["phases"][name]["peak_rss_mb"] for run in runs)
+                        print(f"  {name:8} {timing['seconds']:9.3f}s {timing['peak_rss_mb']:8.1f} MB "
+                              f"{timing['placed']:7}/{result['required']} placed "
+                              f"{timing['conflict_checks']:11} checks")
+                    del case["instance"]
+                    cases.append({**case, **sizes, **result})
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "cases": cases,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Print each phase against the baseline; return the regressions found."""
+    regressions = []
+    before_cases = {case["name"]: case for case in baseline["cases"]}
+    print(f"\nAgainst baseline from {baseline.get('created', '?')} (tolerance {tolerance:.0%}):")
+    for case in results["cases"]:
+        before_case = before_cases.get(case["name"])
+        if before_case is None:
+            print(f"  {case['name']}: not in baseline")
+            continue
+        for name, now in case["phases"].items():
+            before = before_case["phases"].get(name)
+            if before is None:
+                continue
+            problems = []
+            if (now["seconds"] > before["seconds"] * (1 + tolerance)
+                    and now["seconds"] - before["seconds"] > MIN_REGRESSION_SECONDS):
+                problems.append("slower")
+            if now["peak_rss_mb"] > before["peak_rss_mb"] * (1 + tolerance):
+                problems.append("more memory")
+            if now["placed"] < before["placed"]:
+                problems.append("fewer placed")
+            ratio = now["seconds"] / before["seconds"] if before["seconds"] else float("inf")
+            print(f"  {case['name']:24} {name:8} {before['seconds']:9.3f}s -> {now['seconds']:9.3f}s ({ratio:5.2f}x) "
+                  f"{before['peak_rss_mb']:8.1f} -> {now['peak_rss_mb']:8.1f} MB "
+                  f"{before['placed']} -> {now['placed']} placed{'  REGRESSION: ' + ', '.join(problems) if problems else ''}")
+            if problems:
+                regressions.append((case["name"], name, problems))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the timetable solvers on synthetic instances.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10], help="instance sizes, in EJUST samples")
+    parser.add_argument("--tightness", type=float, nargs="+", default=[0.5, 0.8],
+                        help="share of room and instructor slots the sessions fill")
+    parser.add_argument("--solvers", nargs="+", choices=sorted(WebTimetableCSP.SOLVERS), default=["greedy"])
+    parser.add_argument("--seed", type=int, default=0, help="seed for the instance generator and the solvers")
+    parser.add_argument("--time-limit", type=float, default=60.0, help="search budget in seconds")
+    parser.add_argument("--restarts", type=int, default=8, help="greedy runs for the multistart solver")
+    parser.add_argument("--improve", type=float, default=0.0, help="seconds of local-search improvement")
+    parser.add_argument("--no-reports", action="store_true", help="skip the report generation phase")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per case; the fastest is kept")
+    parser.add_argument("--instances", default=None, help="keep the generated instances in this directory")
+    parser.add_argument("--output", default="benchmark_results.json", help="where to write the results")
+    parser.add_argument("--save-baseline", default=None, help="also write the results here as the new baseline")
+    parser.add_argument("--baseline", default=None, help="compare against this saved run")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before a regression")
+    parser.add_argument("--generate", default=None, metavar="DIR",
+                        help="only write one instance (--scale, --tightness) to DIR")
+    parser.add_argument("--scale", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.generate:
+        sizes = generate_instance(args.generate, args.scale, args.tightness[0], args.seed)
+        print(f"Wrote {args.generate}: " + ", ".join(f"{n} {kind}" for kind, n in sizes.items()))
+        sys.exit(0)
+
+    results = run_benchmarks(args)
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote {path}")
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s)")
+            sys.exit(1)
@@ -1,3 +1,4 @@
-// Update this to your Render backend URL (no trailing slash)
-// Example: https://your-app.onrender.com
-window.API_BASE = "https://your-backend.onrender.com";
+// Set this to your Render backend URL (no trailing slash) to serve live data from app.py,
+// e.g. https://your-app.onrender.com. Left empty, the pages read the bundled timetable.json,
+// which python projeeeeeeect.py regenerates (copy it here after a run)
+window.API_BASE = "";
@@ -1,9 +1,31 @@
 import csv
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from enum import Enum
-from typing import List
+from typing import Iterable, List
 import random
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import contextlib
+import cProfile
+import hashlib
+import io
+import json
+import math
+import os
+import pickle
+import pstats
+import re
+import sqlite3
+import sys
+import tracemalloc
+import zlib
+
+
+# Client-side renderer shared by the generated pages, templates/ and frontend/
+TIMETABLE_JS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "timetable.js")
 
 
 class SessionType(Enum):
@@ -18,21 +40,25 @@ class InstructorRole(Enum):
 
 
 class Room:
+    __slots__ = ("building", "space", "capacity", "room_type", "is_lab", "full_name")
+
     def __init__(self, building: str, space: str, capacity: int, room_type: str):
         self.building = building.strip()
         self.space = space.strip()
         self.capacity = capacity
         self.room_type = room_type.strip()
         self.is_lab = "Lab" in self.room_type
-        self.full_name = f"{self.building} – {self.space}"
+        self.full_name = sys.intern(f"{self.building} – {self.space}")
 
     def can_hold(self, student_count: int) -> bool:
         return self.capacity >= student_count
 
 
 class Course:
+    __slots__ = ("course_id", "name", "credits", "has_lecture", "has_tutorial", "has_lab")
+
     def __init__(self, course_id: str, name: str, credits: int, has_lecture: bool, has_tutorial: bool, has_lab: bool):
-        self.course_id = course_id
+        self.course_id = sys.intern(course_id)
         self.name = name
         self.credits = credits
         self.has_lecture = has_lecture
@@ -41,22 +67,40 @@ class Course:
 
 
 class Instructor:
-    def __init__(self, instructor_id: str, name: str, role: InstructorRole, preferred_slots: str, qualified_courses: List[str]):
-        self.instructor_id = instructor_id
+    __slots__ = ("instructor_id", "name", "role", "preferred_slots", "qualified_courses")
+
+    def __init__(self, instructor_id: str, name: str, role: InstructorRole, preferred_slots: str, qualified_courses: Iterable[str]):
+        self.instructor_id = sys.intern(instructor_id)
         self.name = name
         self.role = role
         self.preferred_slots = preferred_slots
-        self.qualified_courses = qualified_courses
+        self.qualified_courses = frozenset(sys.intern(c) for c in qualified_courses)
 
     def can_teach(self, course_id: str) -> bool:
         return course_id in self.qualified_courses
 
+    def availability_mask(self, time_slots: List["TimeSlot"]) -> int:
+        """Compile preferred_slots ("Any time", "Not on Tuesday", "Only on Sunday and Monday")
+        into a bitmask over time_slots. Raises ValueError for text it cannot read."""
+        text = self.preferred_slots.strip().lower()
+        everything = (1 << len(time_slots)) - 1
+        if text in ("", "any", "any time", "anytime"):
+            return everything
+        match = re.fullmatch(r"(not|only) on (.+)", text)
+        if not match:
+            raise ValueError(f"unrecognised preference {self.preferred_slots!r}")
+        days = {d.strip() for d in re.split(r",|/|\band\b", match.group(2)) if d.strip()}
+        on_days = sum(1 << i for i, ts in enumerate(time_slots) if ts.day.lower() in days)
+        return everything & ~on_days if match.group(1) == "not" else on_days
+
 
 class Section:
+    __slots__ = ("section_id", "student_count", "courses", "level", "specialization")
+
     def __init__(self, section_id: str, student_count: int, courses: List[str]):
-        self.section_id = section_id
+        self.section_id = sys.intern(section_id)
         self.student_count = student_count
-        self.courses = courses
+        self.courses = [sys.intern(c) for c in courses]
 
         if "_L1" in section_id:
             self.level = "L1"
@@ -87,18 +131,51 @@ class Section:
             return "General"
 
 
+def _clock_minutes(text: str) -> int:
+    """Minutes since midnight for "9:00 AM", "12:15 PM" or "14:15". Raises ValueError otherwise."""
+    match = re.fullmatch(r"(\d{1,2}):(\d{2})\s*([AaPp][Mm])?", text.strip())
+    if not match:
+        raise ValueError(f"unrecognised time {text!r}")
+    hour, minute, suffix = int(match.group(1)), int(match.group(2)), match.group(3)
+    if suffix:
+        if not 1 <= hour <= 12:
+            raise ValueError(f"unrecognised time {text!r}")
+        hour = hour % 12 + (12 if suffix.lower() == "pm" else 0)
+    if hour > 23 or minute > 59:
+        raise ValueError(f"unrecognised time {text!r}")
+    return hour * 60 + minute
+
+
 class TimeSlot:
+    # start_minute/end_minute are parsed once here; ordinal is the slot's rank across the
+    # whole week (day order of TimeSlots.csv, then start and end), set by _build_indexes
+    __slots__ = ("day", "start_time", "end_time", "time_slot_id", "start_minute", "end_minute", "ordinal")
+
     def __init__(self, day: str, start_time: str, end_time: str, time_slot_id: str):
-        self.day = day
+        self.day = sys.intern(day)
         self.start_time = start_time
         self.end_time = end_time
-        self.time_slot_id = time_slot_id
+        self.time_slot_id = sys.intern(time_slot_id)
+        self.start_minute = _clock_minutes(start_time)
+        self.end_minute = _clock_minutes(end_time)
+        if self.end_minute <= self.start_minute:
+            raise ValueError(f"ends at {end_time!r}, not after its start {start_time!r}")
+        self.ordinal = None
 
     def start_time_obj(self):
-        return datetime.strptime(self.start_time, "%I:%M %p").time()
+        return datetime(1900, 1, 1, self.start_minute // 60, self.start_minute % 60).time()
+
+    def overlaps(self, other: "TimeSlot") -> bool:
+        # Slots of different lengths may overlap partially; touching end to start does not count
+        return (self.day == other.day
+                and self.start_minute < other.end_minute and other.start_minute < self.end_minute)
 
 
 class Assignment:
+    # Ids are the interned strings owned by the loaded Room/Course/Instructor/Section/TimeSlot
+    # objects, so an Assignment is six shared pointers rather than six string copies
+    __slots__ = ("section_id", "course_id", "instructor_id", "room_full_name", "time_slot_id", "session_type")
+
     def __init__(self, section_id: str, course_id: str, instructor_id: str, room_full_name: str, time_slot_id: str, session_type: SessionType):
         self.section_id = section_id
         self.course_id = course_id
@@ -108,8 +185,174 @@ class Assignment:
         self.session_type = session_type
 
 
+class AssignmentTable:
+    """Column-oriented store for many assignments: one int32 code array per field plus the
+    lookup tables the codes index into. Used to ship solver results between processes."""
+
+    COLUMNS = ("section_id", "course_id", "instructor_id", "room_full_name", "time_slot_id", "session_type")
+
+    def __init__(self, tables: dict, codes: dict):
+        self.tables = tables
+        self.codes = codes
+
+    @classmethod
+    def from_assignments(cls, assignments: List[Assignment]) -> "AssignmentTable":
+        tables, codes = {}, {}
+        for column in cls.COLUMNS:
+            lookup, values = {}, []
+            for a in assignments:
+                values.append(lookup.setdefault(getattr(a, column), len(lookup)))
+            tables[column] = list(lookup)
+            codes[column] = np.array(values, dtype=np.int32)
+        return cls(tables, codes)
+
+    def to_assignments(self) -> List[Assignment]:
+        columns = []
+        for c in self.COLUMNS:
+            # Re-intern ids that crossed a process boundary so they share storage again
+            lookup = [sys.intern(v) if isinstance(v, str) else v for v in self.tables[c]]
+            columns.append([lookup[code] for code in self.codes[c].tolist()])
+        return [Assignment(*row) for row in zip(*columns)]
+
+    def __len__(self) -> int:
+        return len(self.codes["section_id"])
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self.codes.values())
+
+
+class Session:
+    """One required (section, course, session type) meeting and its static candidates."""
+
+    __slots__ = ("section", "course_id", "session_type", "instructors", "rooms", "room_key")
+
+    def __init__(self, section: Section, course_id: str, session_type: SessionType, instructors: List[str], rooms: List[Room]):
+        self.section = section
+        self.course_id = course_id
+        self.session_type = session_type
+        self.instructors = instructors
+        self.rooms = rooms
+        self.room_key = (session_type, section.student_count)
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    # The data cache may be written with this module running as __main__ (the CLI) or imported
+    # as projeeeeeeect (app.py, benchmark.py); resolve the model classes to this copy either way,
+    # or enum members would not compare equal to the ones used here
+    CLASSES = {"Room", "Course", "Instructor", "Section", "TimeSlot", "InstructorRole", "SessionType"}
+
+    def find_class(self, module, name):
+        if module in ("__main__", "projeeeeeeect") and name in self.CLASSES:
+            return globals()[name]
+        return super().find_class(module, name)
+
+
+class SolutionStore:
+    """Solved timetables on disk, keyed by the solve key of solution_metadata().
+
+    One SQLite file, so the CLI, the Flask workers and solve jobs share it. Entries are
+    zlib-compressed JSON; once they take more than max_bytes, the least recently used go first.
+    With reuse=False lookups always miss, so every solve runs and replaces its entry.
+    """
+
+    def __init__(self, path: str = ".solution_cache.sqlite3", max_bytes: int = 64 * 2**20, reuse: bool = True):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.reuse = reuse
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        db.execute("CREATE TABLE IF NOT EXISTS solutions (key TEXT PRIMARY KEY, entry BLOB, size INTEGER, used REAL)")
+        return db
+
+    def get(self, key: str):
+        if not self.reuse:
+            return None
+        try:
+            with contextlib.closing(self._connect()) as db, db:
+                row = db.execute("SELECT entry FROM solutions WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                db.execute("UPDATE solutions SET used = ? WHERE key = ?", (time.time(), key))
+            return json.loads(zlib.decompress(row[0]))
+        except (sqlite3.Error, zlib.error, ValueError) as e:
+            print(f" Ignoring solution cache '{self.path}': {e}")
+            return None
+
+    def put(self, key: str, entry: dict):
+        blob = zlib.compress(json.dumps(entry, separators=(",", ":")).encode("utf-8"))
+        try:
+            with contextlib.closing(self._connect()) as db, db:
+                db.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?)", (key, blob, len(blob), time.time()))
+                total, evict = 0, []
+                for old_key, size in db.execute("SELECT key, size FROM solutions ORDER BY used DESC"):
+                    total += size
+                    if total > self.max_bytes and old_key != key:
+                        evict.append((old_key,))
+                db.executemany("DELETE FROM solutions WHERE key = ?", evict)
+        except sqlite3.Error as e:
+            print(f"Could not write solution cache: {e}")
+
+
 class WebTimetableCSP:
-    def __init__(self):
+    # Solver name -> method. Each solver takes the same keyword options
+    # (time_limit, restarts, workers, seed), ignores the ones it does not use,
+    # and leaves its result in self.assignments and self.solver_stats.
+    SOLVERS = {
+        "greedy": "_solve_greedy",
+        "backtracking": "_solve_backtracking",
+        "multistart": "_solve_multistart",
+        "cpsat": "_solve_cpsat",
+    }
+
+    # Input files in load order, with the loader that parses each one
+    INPUT_FILES = (
+        ("Bulding.xlsx", "_load_rooms"),
+        ("courses_edited.xlsx", "_load_courses_from_excel"),
+        ("Instructor.csv", "_load_instructors"),
+        ("Sections.csv", "_load_sections"),
+        ("TimeSlots.csv", "_load_time_slots"),
+    )
+    # Bump when the model classes or loaders change shape, to invalidate old caches
+    CACHE_VERSION = 4
+    # Report pages, with the file each is written to and the generator that renders it
+    REPORT_PAGES = {
+        "data": ("timetable.json", "render_payload"),
+        "main": ("timetable.html", "render_main_timetable"),
+        "professors": ("professors.html", "render_professors_timetable"),
+        "assistants": ("assistants.html", "render_assistants_timetable"),
+        "rooms": ("rooms.html", "render_rooms_timetable"),
+    }
+    # Bump when the manifest digests change meaning, so generate_all_reports(only_changed=True) redraws everything
+    REPORT_VERSION = 2
+    # Bump when a solver change can give another timetable for the same input and options, so
+    # solution_store stops handing out timetables of the old code
+    SOLVER_VERSION = 1
+    # solve_config options each solver ignores; they are left out of solution_store keys so that
+    # changing them does not miss the cache. Multistart picks its best run the same way whatever
+    # the number of workers; CP-SAT's parallel search does depend on it
+    SOLVE_KEY_IGNORES = {
+        "greedy": ("time_limit", "restarts", "workers"),
+        "backtracking": ("restarts", "workers"),
+        "multistart": ("time_limit", "workers"),
+        "cpsat": ("restarts",),
+    }
+    # Why a session could not be placed, in the order unplaced_sessions tests them
+    UNPLACED_BLOCKERS = {
+        "no_room": "no room of this type holds the section",
+        "section_full": "the section has no free slot",
+        "instructors_saturated": "no qualified instructor is free while the section is",
+        "rooms_saturated": "every suitable room is taken while the section and an instructor are free",
+        "placeable": "a free slot remains; the solver did not reach it",
+    }
+
+    def __init__(self, preference_mode: str = "soft"):
+        # How Instructor.preferred_slots is honoured: "hard" never schedules outside it,
+        # "soft" tries preferred slots first and counts violations in soft_penalty, "off" ignores it
+        if preference_mode not in ("hard", "soft", "off"):
+            raise ValueError(f"Unknown preference mode: {preference_mode}")
+        self.preference_mode = preference_mode
         self.rooms = []
         self.courses = {}
         self.instructors = {}
@@ -117,39 +360,258 @@ class WebTimetableCSP:
         self.time_slots = []
         self.assignments = []
         self.missing_instructors = set()
+        self.solver_stats = {}
+        self.improvement_stats = {}
+        self.incremental_stats = {}
+        # Sessions the last solve left out, with their blockers (see unplaced_sessions)
+        self.unplaced = []
+        self.load_timings = {}
+        self.report_timings = {}
+        self.instructor_index = {}
+        self.room_index = {}
+        self.room_bits = {}
+        self.unpreferred_masks = {}
+        self.slot_bits = {}
+        self.instructor_masks = {}
+        self.room_masks = {}
+        self.section_masks = {}
+        self.all_slots_mask = 0
+        self.slot_conflicts = {}
+        self.slot_overlaps = []
+        # Instrumentation, exported by metrics(). phase_timings holds seconds per phase
+        # ("load", "load/Sections.csv", "solve", "improve", "reports/main"...)
+        self.phase_timings = {}
+        self.solver_name = None
+        # Every random choice of the solvers comes from rng, reseeded with the seed of each solve,
+        # so the same input, seed and solve_config give the same timetable (see solution_metadata)
+        self.seed = 0
+        self.rng = random.Random(self.seed)
+        self.solve_config = {}
+        self.deterministic = True
+        # Optional SolutionStore consulted before each solve; from_cache tells if the last one hit
+        self.solution_store = None
+        self.from_cache = False
+        # Occupancy masks tested for clashes (calls to _blocked) in this process
+        self.conflict_checks = 0
+        # (instructor, room, slot) candidates checked, and those rejected by their first clash
+        self.candidate_checks = 0
+        self.rejections = {"section": 0, "instructor": 0, "preference": 0, "room": 0}
+        # (section, course, session type) -> candidates the greedy pass went through to place it
+        self.candidates_tried = {}
+        # Opt-in profilers, see enable_profiling
+        self.profiler = None
+        self.trace_memory = False
+        self.memory_peaks = {}
+        self._phase_depth = 0
+        # Optional callable given a dict of solver progress (phase, placed, backtracks, cost...)
+        self.progress_callback = None
+        self._progress_reported = 0.0
+
+    def __getstate__(self):
+        # Process-local hooks stay behind when the system is sent to worker processes
+        state = self.__dict__.copy()
+        state.update(progress_callback=None, profiler=None, solution_store=None)
+        return state
+
+    def enable_profiling(self, cpu: bool = True, memory: bool = False):
+        """Run the top-level phases under cProfile and/or tracemalloc; see metrics()["profile"]."""
+        if cpu:
+            self.profiler = cProfile.Profile()
+        if memory:
+            self.trace_memory = True
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+
+    @contextlib.contextmanager
+    def _timed(self, phase: str):
+        # Record the phase's seconds; outermost phases also run under the enabled profilers
+        outermost = self._phase_depth == 0
+        self._phase_depth += 1
+        if outermost:
+            if self.trace_memory:
+                tracemalloc.reset_peak()
+            if self.profiler is not None:
+                self.profiler.enable()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_timings[phase] = time.perf_counter() - started
+            self._phase_depth -= 1
+            if outermost:
+                if self.profiler is not None:
+                    self.profiler.disable()
+                if self.trace_memory:
+                    self.memory_peaks[phase] = tracemalloc.get_traced_memory()[1]
+
+    def profile_functions(self, limit: int = 25) -> list:
+        # The functions with the most cumulative time under enable_profiling(cpu=True)
+        if self.profiler is None:
+            return []
+        try:
+            stats = pstats.Stats(self.profiler).stats
+        except TypeError:  # nothing profiled yet
+            return []
+        ranked = sorted(stats.items(), key=lambda item: -item[1][3])[:limit]
+        return [{"function": f"{os.path.basename(file)}:{line}({name})", "calls": calls,
+                 "own_seconds": round(own, 6), "cumulative_seconds": round(cumulative, 6)}
+                for (file, line, name), (_, calls, own, cumulative, _) in ranked]
+
+    def metrics(self) -> dict:
+        """Instrumentation gathered so far, as JSON-ready data.
+
+        phases holds seconds per phase; checks the candidates checked, their rejections by
+        first clashing reason and the occupancy masks tested; candidates how many candidates the
+        greedy pass went through per session, with the hardest sessions; solver and improvement
+        the stats of the last solve and local search. With enable_profiling, profile holds the
+        costliest functions and the traced memory peak of each phase.
+        """
+        tried = sorted(self.candidates_tried.items(), key=lambda item: -item[1])
+        total = sum(n for _, n in tried)
+        metrics = {
+            "phases": {phase: round(seconds, 6) for phase, seconds in self.phase_timings.items()},
+            "solution": {"required": len(self._required_sessions()), "placed": len(self.assignments),
+                         "soft_penalty": self.soft_penalty() if self.slot_bits else None,
+                         "unplaced": {blocker: sum(1 for u in self.unplaced if u["blocker"] == blocker)
+                                      for blocker in self.UNPLACED_BLOCKERS}},
+            "checks": {"candidates": self.candidate_checks, "rejections": dict(self.rejections),
+                       "conflict_masks": self.conflict_checks},
+            "candidates": {
+                "sessions": len(tried),
+                "tried": total,
+                "mean": round(total / len(tried), 2) if tried else 0,
+                "max": tried[0][1] if tried else 0,
+                "hardest": [{"section": sid, "course": cid, "type": kind, "tried": n}
+                            for (sid, cid, kind), n in tried[:10]],
+            },
+            "meta": self.solution_metadata(),
+            "solver": {"name": self.solver_name, **self.solver_stats},
+            "improvement": {k: v for k, v in self.improvement_stats.items() if k != "trajectory"},
+        }
+        if self.profiler is not None or self.trace_memory:
+            metrics["profile"] = {"functions": self.profile_functions(), "memory_peaks": dict(self.memory_peaks)}
+        return metrics
+
+    def load_data(self, cache_path: str = ".timetable_cache.pkl"):
+        """Load the input files, reusing the binary snapshot at cache_path while they are unchanged.
 
-    def load_data(self):
+        Pass cache_path=None to always parse the files.
+        """
         print("Loading data from files...")
-        self._load_rooms()
-        self._load_courses_from_excel()
-        self._load_instructors()
-        self._load_sections()
-        self._load_time_slots()
-        print(f"Loaded {len(self.rooms)} rooms")
-        print(f"Loaded {len(self.courses)} courses")
-        print(f"Loaded {len(self.instructors)} instructors")
-        print(f"Loaded {len(self.sections)} sections")
-        print(f"Loaded {len(self.time_slots)} time slots")
+        self.load_timings = {}
+        with self._timed("load"):
+            if cache_path and self._load_cached(cache_path):
+                print(f"Reused cached data from '{cache_path}' ({self.load_timings['cache']:.3f}s)")
+            else:
+                sources = self._source_fingerprints() if cache_path else None
+                for filename, loader in self.INPUT_FILES:
+                    with self._timed(f"load/{filename}"):
+                        getattr(self, loader)()
+                    self.load_timings[filename] = self.phase_timings[f"load/{filename}"]
+                if cache_path:
+                    self._save_cache(cache_path, sources)
+            with self._timed("load/indexes"):
+                self._build_indexes()
+        for label, items, filename in (("rooms", self.rooms, "Bulding.xlsx"),
+                                       ("courses", self.courses, "courses_edited.xlsx"),
+                                       ("instructors", self.instructors, "Instructor.csv"),
+                                       ("sections", self.sections, "Sections.csv"),
+                                       ("time slots", self.time_slots, "TimeSlots.csv")):
+            took = f" ({self.load_timings[filename]:.3f}s)" if filename in self.load_timings else ""
+            print(f"Loaded {len(items)} {label}{took}")
+
+    def _source_fingerprints(self, previous: dict = None) -> dict:
+        # file -> (mtime_ns, size, sha256); files whose mtime and size match previous are not re-hashed
+        fingerprints = {}
+        for filename, _ in self.INPUT_FILES:
+            try:
+                st = os.stat(filename)
+            except OSError:
+                fingerprints[filename] = None
+                continue
+            old = (previous or {}).get(filename)
+            if old and old[0] == st.st_mtime_ns and old[1] == st.st_size:
+                fingerprints[filename] = old
+                continue
+            with open(filename, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            fingerprints[filename] = (st.st_mtime_ns, st.st_size, digest)
+        return fingerprints
+
+    def _save_cache(self, cache_path: str, sources: dict):
+        snapshot = {
+            "version": self.CACHE_VERSION,
+            "sources": sources,
+            "rooms": self.rooms,
+            "courses": self.courses,
+            "instructors": self.instructors,
+            "sections": self.sections,
+            "time_slots": self.time_slots,
+        }
+        # Written beside the cache and renamed over it, so a concurrent reader (another web worker
+        # or the CLI) sees the old snapshot or the new one, never a truncated pickle
+        partial = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(partial, "wb") as f:
+                pickle.dump(snapshot, f, protocol=5)
+            os.replace(partial, cache_path)
+        except OSError as e:
+            print(f"Could not write data cache: {e}")
+            with contextlib.suppress(OSError):
+                os.remove(partial)
+
+    def _load_cached(self, cache_path: str) -> bool:
+        started = time.perf_counter()
+        try:
+            with open(cache_path, "rb") as f:
+                snapshot = _SnapshotUnpickler(f).load()
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, IndexError, TypeError,
+                ValueError):
+            # Missing, damaged, or pickled from model classes that have since changed
+            return False
+        if not isinstance(snapshot, dict) or snapshot.get("version") != self.CACHE_VERSION:
+            return False
+        sources = self._source_fingerprints(snapshot["sources"])
+        digests = {name: fp and fp[2] for name, fp in sources.items()}
+        if digests != {name: fp and fp[2] for name, fp in snapshot["sources"].items()}:
+            return False
+
+        self.rooms = snapshot["rooms"]
+        self.courses = snapshot["courses"]
+        self.instructors = snapshot["instructors"]
+        self.sections = snapshot["sections"]
+        self.time_slots = snapshot["time_slots"]
+        if sources != snapshot["sources"]:
+            # Same content under a new mtime (e.g. a re-save): refresh so we skip hashing next time
+            self._save_cache(cache_path, sources)
+        self.load_timings["cache"] = time.perf_counter() - started
+        return True
+
+    @staticmethod
+    def _text_column(df, column, default: str = ""):
+        # Stripped strings with blanks and NaN replaced by default; a missing column is all default
+        if column not in df:
+            return pd.Series(default, index=df.index, dtype=object)
+        values = df[column].astype(object).where(df[column].notna(), "").astype(str).str.strip()
+        return values.where(values != "", default)
 
     def _load_rooms(self):
         try:
-            df = pd.read_excel('Bulding.xlsx', header=None)
-            for i in range(len(df)):
-                if pd.notna(df.iloc[i, 0]) and str(df.iloc[i, 0]).strip() != '':
-                    header_row = i
-                    break
-            else:
-                header_row = 0
-            df = pd.read_excel('Bulding.xlsx', header=header_row)
+            # One read: the header is the first row with something in the first column
+            raw = pd.read_excel('Bulding.xlsx', header=None)
+            filled = raw.iloc[:, 0].notna() & (raw.iloc[:, 0].astype(str).str.strip() != '')
+            header_row = int(filled.values.argmax()) if filled.any() else 0
+            df = raw.iloc[header_row + 1:, :4]
             df.columns = ['Building', 'Space', 'Capacity', 'Type']
-            for _, row in df.iterrows():
-                bld = str(row['Building']).strip()
-                spc = str(row['Space']).strip()
-                if bld.lower() in ['nan', ''] or spc.lower() in ['nan', '']:
-                    continue
-                cap = int(row['Capacity']) if pd.notna(row['Capacity']) else 50
-                typ = str(row['Type']).strip() if pd.notna(row['Type']) else "Lecture"
-                self.rooms.append(Room(bld, spc, cap, typ))
+
+            bld = self._text_column(df, 'Building')
+            spc = self._text_column(df, 'Space')
+            keep = (bld != '') & (spc != '')
+            cap = pd.to_numeric(df['Capacity'], errors='coerce').fillna(50).astype(int)
+            typ = self._text_column(df, 'Type', "Lecture")
+            self.rooms.extend(
+                Room(b, sp, c, t) for b, sp, c, t in zip(bld[keep], spc[keep], cap[keep], typ[keep])
+            )
         except Exception as e:
             print(f"Error loading rooms: {e}")
             self.rooms = [Room("Hall", "Blue", 150, "Lecture")]
@@ -157,16 +619,14 @@ class WebTimetableCSP:
     def _load_courses_from_excel(self):
         try:
             df = pd.read_excel('courses_edited.xlsx')
-            for _, row in df.iterrows():
-                cid = str(row['CourseID']).strip()
-                if cid == 'nan':
-                    continue
-                name = str(row.get('CourseName', cid)).strip()
-                credits = int(row.get('Credits', 3))
-                has_lecture = str(row.get('Lecture', 'No')).strip().lower() == 'yes'
-                has_tutorial = str(row.get('Tutorial', 'No')).strip().lower() == 'yes'
-                has_lab = str(row.get('Lab', 'No')).strip().lower() == 'yes'
-                self.courses[cid] = Course(cid, name, credits, has_lecture, has_tutorial, has_lab)
+            cid = self._text_column(df, 'CourseID')
+            keep = cid != ''
+            name = self._text_column(df, 'CourseName').where(lambda n: n != '', cid)
+            credits = (pd.to_numeric(df['Credits'], errors='coerce').fillna(3).astype(int)
+                       if 'Credits' in df else pd.Series(3, index=df.index))
+            flags = [self._text_column(df, col, 'No').str.lower() == 'yes' for col in ('Lecture', 'Tutorial', 'Lab')]
+            for c, n, cr, lec, tut, lab in zip(cid[keep], name[keep], credits[keep], *(f[keep] for f in flags)):
+                self.courses[c] = Course(c, n, int(cr), bool(lec), bool(tut), bool(lab))
         except Exception as e:
             print(f"Error loading courses from courses_edited.xlsx: {e}")
 
@@ -188,25 +648,16 @@ class WebTimetableCSP:
 
     def _load_sections(self):
         try:
-            df = pd.read_csv('Sections.csv', encoding='utf-8-sig')
+            df = pd.read_csv('Sections.csv', encoding='utf-8-sig', dtype=str, keep_default_na=False)
             valid_course_ids = set(self.courses.keys())
 
-            for _, row in df.iterrows():
-                sid = str(row['SectionID']).strip()
-                if not sid or sid == 'nan':
-                    continue
-
-                try:
-                    count = int(row['StudentCount'])
-                except:
-                    count = 20
-
-                courses_str = str(row['Courses']).strip()
-                if courses_str == 'nan':
-                    courses = []
-                else:
-                    courses = [c.strip() for c in courses_str.split(',') if c.strip()]
+            sid = self._text_column(df, 'SectionID')
+            keep = sid != ''
+            counts = pd.to_numeric(df['StudentCount'], errors='coerce').fillna(20).astype(int)
+            course_lists = self._text_column(df, 'Courses').str.split(',')
 
+            for sid, count, courses in zip(sid[keep], counts[keep], course_lists[keep]):
+                courses = [c.strip() for c in courses if c.strip()]
                 valid_courses = [cid for cid in courses if cid in valid_course_ids]
                 dropped = [cid for cid in courses if cid not in valid_course_ids]
                 if dropped:
@@ -216,7 +667,7 @@ class WebTimetableCSP:
                     print(f" Skipping {sid} (no valid courses)")
                     continue
 
-                self.sections.append(Section(sid, count, valid_courses))
+                self.sections.append(Section(sid, int(count), valid_courses))
             print(f"Loaded {len(self.sections)} sections")
         except Exception as e:
             print(f"Error loading sections: {e}")
@@ -233,46 +684,387 @@ class WebTimetableCSP:
                     end = row['EndTime'].strip()
                     tid = row['TimeSlotID'].strip()
                     if day and start and end and tid:
-                        self.time_slots.append(TimeSlot(day, start, end, tid))
+                        # A bad row is skipped on its own; the rest of the file still loads
+                        try:
+                            self.time_slots.append(TimeSlot(day, start, end, tid))
+                        except ValueError as e:
+                            print(f" Skipping time slot {tid} (line {reader.line_num}): {e}")
         except Exception as e:
             print(f"Error loading time slots: {e}")
 
-    def generate_timetable(self):
+    def _build_indexes(self):
+        # course -> role -> instructor ids, in Instructor.csv order
+        self.instructor_index = {}
+        for iid, inst in self.instructors.items():
+            for cid in inst.qualified_courses:
+                self.instructor_index.setdefault(cid, {}).setdefault(inst.role, []).append(iid)
+
+        # instructor id -> slots outside their PreferredSlots (absent means no restriction)
+        self.unpreferred_masks = {}
+        everything = (1 << len(self.time_slots)) - 1
+        for iid, inst in self.instructors.items():
+            try:
+                mask = everything & ~inst.availability_mask(self.time_slots)
+            except ValueError as e:
+                print(f" Ignoring preference of {iid}: {e}")
+                continue
+            if mask:
+                self.unpreferred_masks[iid] = mask
+
+        # time slot id -> bits of every slot it clashes with, itself included; slot_overlaps
+        # lists only the slots that partially overlap others, so it is empty for a plain grid
+        day_order = {day: k for k, day in enumerate(dict.fromkeys(ts.day for ts in self.time_slots))}
+        ranked = sorted(self.time_slots, key=lambda ts: (day_order[ts.day], ts.start_minute, ts.end_minute))
+        for ordinal, ts in enumerate(ranked):
+            ts.ordinal = ordinal
+        self.slot_conflicts = {}
+        self.slot_overlaps = []
+        for i, ts in enumerate(self.time_slots):
+            overlap = 0
+            for k, other in enumerate(self.time_slots):
+                if k != i and ts.overlaps(other):
+                    overlap |= 1 << k
+            self.slot_conflicts[ts.time_slot_id] = 1 << i | overlap
+            if overlap:
+                self.slot_overlaps.append((1 << i, overlap))
+
+        # (session type, student count) -> candidate rooms, for every count a section needs
+        self.room_bits = {r.full_name: 1 << i for i, r in enumerate(self.rooms)}
+        self.room_index = {}
+        for count in {sec.student_count for sec in self.sections}:
+            for session_type in SessionType:
+                self._suitable_rooms(session_type, count)
+
+    def _suitable_rooms(self, session_type: SessionType, student_count: int) -> List[Room]:
+        key = (session_type, student_count)
+        rooms = self.room_index.get(key)
+        if rooms is None:
+            rooms = []
+            for r in self.rooms:
+                if not r.can_hold(student_count):
+                    continue
+
+                if session_type == SessionType.LAB:
+                    if r.is_lab:
+                        rooms.append(r)
+                elif session_type == SessionType.TUTORIAL:
+                    if r.capacity <= 25:
+                        rooms.append(r)
+                else:
+                    if not r.is_lab:
+                        rooms.append(r)
+
+            if session_type == SessionType.LECTURE:
+                rooms.sort(key=lambda r: -r.capacity)
+            self.room_index[key] = rooms
+        return rooms
+
+    def generate_timetable(self, solver: str = "greedy", time_limit: float = 60.0,
+                           restarts: int = 8, workers: int = None, seed: int = 0):
         print("\nGenerating timetable with Lecture + Tutorial + Lab...")
         if not self.sections or not self.instructors:
             print("ERROR: Missing data!")
             return False
 
-        self.assignments = []
-
-        for section in self.sections:
-            for course_id in section.courses:
-                course = self.courses[course_id]
-                if course.has_lecture:
-                    self._assign_session(section, course_id, SessionType.LECTURE)
-                if course.has_tutorial:
-                    self._assign_session(section, course_id, SessionType.TUTORIAL)
-                if course.has_lab:
-                    self._assign_session(section, course_id, SessionType.LAB)
+        method = self.SOLVERS.get(solver)
+        if method is None:
+            raise ValueError(f"Unknown solver: {solver}")
+        self.solver_name = solver
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.solve_config = {"solver": solver, "seed": seed, "time_limit": time_limit, "restarts": restarts,
+                             "workers": workers, "preferences": self.preference_mode}
+        with self._timed("solve"):
+            if not self._restore_solution():
+                getattr(self, method)(time_limit=time_limit, restarts=restarts, workers=workers, seed=seed)
+                # A search cut short by its time limit, or CP-SAT's parallel workers, can end elsewhere next time
+                self.deterministic = solver in ("greedy", "multistart") or (
+                    solver == "backtracking" and not self.solver_stats.get("timed_out"))
+                self._store_solution()
+
+        self._report_missing_instructors()
+        self._report_unplaced()
+        print(f" Generated {len(self.assignments)} assignments")
+        return True
 
+    def _report_missing_instructors(self):
         if self.missing_instructors:
             print("\n MISSING INSTRUCTORS — Add these to Instructor.csv:")
             for item in sorted(self.missing_instructors):
                 print(f"  - {item}")
 
+    def unplaced_sessions(self) -> List[dict]:
+        """Every required session left without an assignment, with what blocks it.
+
+        Read off the occupancy masks rather than by searching again: the section's free slots are
+        narrowed to those where a qualified instructor is free, then to those where a suitable room
+        is free too, and the blocker is the first entry of UNPLACED_BLOCKERS that leaves none.
+        """
+        placed = {}
+        for a in self.assignments:
+            key = (a.section_id, a.course_id, a.session_type)
+            placed[key] = placed.get(key, 0) + 1
+        unplaced = []
+        for section, course_id, session_type in self._required_sessions():
+            key = (section.section_id, course_id, session_type)
+            if placed.get(key):
+                placed[key] -= 1
+                continue
+            rooms = self._suitable_rooms(session_type, section.student_count)
+            instructors = self._candidate_instructors(course_id, session_type)
+            section_free = self.all_slots_mask & ~self._blocked(self.section_masks.get(section.section_id, 0))
+            instructor_free = 0
+            for iid in instructors:
+                instructor_free |= section_free & ~self._instructor_busy(iid)
+            room_free = 0
+            for room in rooms:
+                room_free |= instructor_free & ~self._blocked(self.room_masks.get(room.full_name, 0))
+            if not rooms:
+                blocker = "no_room"
+            elif not section_free:
+                blocker = "section_full"
+            elif not instructor_free:
+                blocker = "instructors_saturated"
+            elif not room_free:
+                blocker = "rooms_saturated"
+            else:
+                blocker = "placeable"
+            unplaced.append({
+                "section": section.section_id,
+                "course": course_id,
+                "course_name": self.courses[course_id].name,
+                "type": session_type.value,
+                "students": section.student_count,
+                "blocker": blocker,
+                "reason": self.UNPLACED_BLOCKERS[blocker],
+                "instructors": instructors,
+                "missing_instructor": any(iid.startswith("UNKNOWN_") for iid in instructors),
+                "suitable_rooms": len(rooms),
+                "section_free_slots": section_free.bit_count(),
+                "instructor_free_slots": instructor_free.bit_count(),
+                "room_free_slots": room_free.bit_count(),
+            })
+        return unplaced
+
+    def _report_unplaced(self):
+        self.unplaced = self.unplaced_sessions()
+        if self.unplaced:
+            counts = {}
+            for entry in self.unplaced:
+                counts[entry["blocker"]] = counts.get(entry["blocker"], 0) + 1
+            print(f" {len(self.unplaced)} sessions unplaced: "
+                  + ", ".join(f"{n} {blocker.replace('_', ' ')}" for blocker, n in counts.items()))
+
+    def export_unplaced(self, path: str):
+        """Write unplaced_sessions() to path, as CSV when it ends in .csv and JSON otherwise."""
+        unplaced = self.unplaced_sessions()
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            if path.lower().endswith(".csv"):
+                writer = csv.DictWriter(f, fieldnames=["section", "course", "course_name", "type", "students",
+                                                       "blocker", "reason", "instructors", "missing_instructor",
+                                                       "suitable_rooms", "section_free_slots",
+                                                       "instructor_free_slots", "room_free_slots"])
+                writer.writeheader()
+                writer.writerows({**entry, "instructors": ";".join(entry["instructors"])} for entry in unplaced)
+            else:
+                json.dump(unplaced, f, indent=2)
+        return unplaced
+
+    def _data_snapshot(self):
+        # Normalised view of the loaded input files, used to diff one run against the next
+        return {
+            "rooms": {r.full_name: [r.capacity, r.room_type] for r in self.rooms},
+            "courses": {cid: [c.name, c.credits, c.has_lecture, c.has_tutorial, c.has_lab]
+                        for cid, c in self.courses.items()},
+            "instructors": {iid: [inst.name, inst.role.value, inst.preferred_slots, sorted(inst.qualified_courses)]
+                            for iid, inst in self.instructors.items() if not iid.startswith("UNKNOWN_")},
+            "sections": {sec.section_id: [sec.student_count, sec.courses] for sec in self.sections},
+            "time_slots": {ts.time_slot_id: [ts.day, ts.start_time, ts.end_time] for ts in self.time_slots},
+        }
+
+    def save_state(self, path: str = "timetable_state.json"):
+        """Write the loaded data and current assignments so the next run can re-solve incrementally."""
+        state = {
+            "meta": self.solution_metadata(),
+            "data": self._data_snapshot(),
+            "assignments": [[a.section_id, a.course_id, a.instructor_id, a.room_full_name,
+                             a.time_slot_id, a.session_type.name] for a in self.assignments],
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+
+    def generate_timetable_incremental(self, state_path: str = "timetable_state.json", **solver_options):
+        """Re-solve against the timetable saved by save_state instead of starting over.
+
+        Every saved assignment that is still valid under the new data (section still takes the
+        course, instructor still qualified, room still suitable, slot still exists, no clash with
+        what was already kept) is kept; only the remaining sessions are placed by the greedy pass.
+        Without a saved state this is a plain generate_timetable(**solver_options).
+        """
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            print(f"\nNo previous timetable in '{state_path}'; generating from scratch")
+            return self.generate_timetable(**solver_options)
+
+        print("\nUpdating previous timetable with changed data...")
+        if not self.sections or not self.instructors:
+            print("ERROR: Missing data!")
+            return False
+
+        self.solver_name = "incremental"
+        self.seed = solver_options.get("seed", 0)
+        self.rng = random.Random(self.seed)
+        previous = hashlib.sha256(json.dumps(state["assignments"]).encode()).hexdigest()
+        self.solve_config = {"solver": "incremental", "seed": self.seed, "previous": previous,
+                             "preferences": self.preference_mode}
+        self.deterministic = True
+        with self._timed("solve"):
+            if not self._restore_solution():
+                self._solve_incremental(state)
+                self._store_solution()
+        stats = self.incremental_stats
+        print(f" Kept {stats['kept']} assignments, dropped {stats['dropped']}, placed {stats['replaced']} new")
+
+        self._report_missing_instructors()
+        self._report_unplaced()
         print(f" Generated {len(self.assignments)} assignments")
         return True
 
-    def _assign_session(self, section: Section, course_id: str, session_type: SessionType) -> bool:
+    def _solve_incremental(self, state: dict):
+        # Keep what is still valid of state["assignments"], then place the rest greedily
+        changes = {}
+        current = self._data_snapshot()
+        for kind, entries in current.items():
+            before = state["data"].get(kind, {})
+            changes[kind] = {
+                "added": sorted(set(entries) - set(before)),
+                "removed": sorted(set(before) - set(entries)),
+                "changed": sorted(k for k in set(entries) & set(before) if entries[k] != before[k]),
+            }
+            if any(changes[kind].values()):
+                print(f" {kind}: {len(changes[kind]['added'])} added, {len(changes[kind]['removed'])} removed, "
+                      f"{len(changes[kind]['changed'])} changed")
+
+        self._reset_assignments()
+        required = self._required_sessions()
+        open_sessions = {}
+        for section, course_id, session_type in required:
+            key = (section.section_id, course_id, session_type)
+            open_sessions[key] = open_sessions.get(key, 0) + 1
+        sections = {sec.section_id: sec for sec in self.sections}
+
+        kept = 0
+        for section_id, course_id, iid, room_name, tsid, session_name in state["assignments"]:
+            session_type = SessionType[session_name]
+            key = (section_id, course_id, session_type)
+            if not open_sessions.get(key) or tsid not in self.slot_bits:
+                continue
+            section = sections[section_id]
+            if iid not in self._candidate_instructors(course_id, session_type):
+                continue
+            if room_name not in {r.full_name for r in self._suitable_rooms(session_type, section.student_count)}:
+                continue
+            a = Assignment(section_id, course_id, iid, room_name, tsid, session_type)
+            if not self._is_valid_assignment(a):
+                continue
+            self._add_assignment(a)
+            open_sessions[key] -= 1
+            kept += 1
+
+        for section, course_id, session_type in required:
+            key = (section.section_id, course_id, session_type)
+            if open_sessions[key]:
+                open_sessions[key] -= 1
+                self._assign_session(section, course_id, session_type)
+
+        self.incremental_stats = {
+            "changes": changes,
+            "kept": kept,
+            "dropped": len(state["assignments"]) - kept,
+            "replaced": len(self.assignments) - kept,
+            "unplaced": len(required) - len(self.assignments),
+        }
+
+    def _solve_key(self) -> str:
+        ignored = self.SOLVE_KEY_IGNORES.get(self.solve_config.get("solver"), ())
+        config = {name: value for name, value in self.solve_config.items() if name not in ignored}
+        return hashlib.sha256(json.dumps([self.SOLVER_VERSION, self.input_hash(), config], sort_keys=True)
+                              .encode()).hexdigest()
+
+    def _restore_solution(self) -> bool:
+        # Take the timetable for the current solve_config from solution_store, if it has one
+        self.from_cache = False
+        if self.solution_store is None:
+            return False
+        key = self._solve_key()
+        entry = self.solution_store.get(key)
+        if entry is None:
+            return False
+        # Create the same fallback instructors the solve did
+        for section, course_id, session_type in self._required_sessions():
+            self._candidate_instructors(course_id, session_type)
+        self._reset_assignments()
+        for section_id, course_id, iid, room_name, tsid, session_name in entry["assignments"]:
+            self._add_assignment(Assignment(section_id, course_id, iid, room_name, tsid, SessionType[session_name]))
+        self.solver_stats = entry["solver_stats"]
+        self.improvement_stats = entry["improvement_stats"]
+        self.incremental_stats = entry["incremental_stats"]
+        self.deterministic = entry["deterministic"]
+        self.from_cache = True
+        print(f" Reused solution {key[:12]} from '{self.solution_store.path}'")
+        return True
+
+    def _store_solution(self):
+        if self.solution_store is not None:
+            self.solution_store.put(self._solve_key(), {
+                "assignments": [[a.section_id, a.course_id, a.instructor_id, a.room_full_name,
+                                 a.time_slot_id, a.session_type.name] for a in self.assignments],
+                "solver_stats": self.solver_stats,
+                "improvement_stats": self.improvement_stats,
+                "incremental_stats": self.incremental_stats,
+                "deterministic": self.deterministic,
+            })
+
+    def _report_progress(self, final: bool = False, **fields):
+        # Pass solver progress to progress_callback, at most twice a second unless final
+        if self.progress_callback is None:
+            return
+        now = time.monotonic()
+        if not final and now - self._progress_reported < 0.5:
+            return
+        self._progress_reported = now
+        self.progress_callback(fields)
+
+    def _solve_greedy(self, **options):
+        self._reset_assignments()
+        required = self._required_sessions()
+        for section, course_id, session_type in required:
+            self._assign_session(section, course_id, session_type)
+            self._report_progress(phase="greedy", placed=len(self.assignments), required=len(required))
+        self.solver_stats = {"placed": len(self.assignments)}
+
+    def _required_sessions(self):
+        sessions = []
+        for section in self.sections:
+            for course_id in section.courses:
+                course = self.courses[course_id]
+                if course.has_lecture:
+                    sessions.append((section, course_id, SessionType.LECTURE))
+                if course.has_tutorial:
+                    sessions.append((section, course_id, SessionType.TUTORIAL))
+                if course.has_lab:
+                    sessions.append((section, course_id, SessionType.LAB))
+        return sessions
+
+    def _candidate_instructors(self, course_id: str, session_type: SessionType) -> List[str]:
         if course_id in {"AID414", "BIF410", "CNC414", "CSC413"}:
             required_role = InstructorRole.ASSISTANT_PROFESSOR
         else:
             required_role = InstructorRole.PROFESSOR if session_type == SessionType.LECTURE else InstructorRole.ASSISTANT_PROFESSOR
 
-        suitable_instructors = [
-            iid for iid, inst in self.instructors.items()
-            if inst.can_teach(course_id) and inst.role == required_role
-        ]
+        suitable_instructors = self.instructor_index.get(course_id, {}).get(required_role, [])
 
         if not suitable_instructors:
             fallback_id = f"UNKNOWN_{required_role.name}_{course_id}"
@@ -284,58 +1076,1047 @@ class WebTimetableCSP:
                 [course_id]
             )
             suitable_instructors = [fallback_id]
+            self.instructor_index.setdefault(course_id, {})[required_role] = suitable_instructors
             self.missing_instructors.add(f"{course_id} ({session_type.value}) → {required_role.value}")
+        return suitable_instructors
 
-        suitable_rooms = []
-        for r in self.rooms:
-            if not r.can_hold(section.student_count):
-                continue
-
-            if session_type == SessionType.LAB:
-                if r.is_lab:
-                    suitable_rooms.append(r)
-            elif session_type == SessionType.TUTORIAL:
-                if r.capacity <= 25:
-                    suitable_rooms.append(r)
-            else:  
-                if not r.is_lab:
-                    suitable_rooms.append(r)
+    def _assign_session(self, section: Section, course_id: str, session_type: SessionType) -> bool:
+        suitable_instructors = self._candidate_instructors(course_id, session_type)
 
+        suitable_rooms = self._suitable_rooms(session_type, section.student_count)
         if not suitable_rooms:
             return False
 
-        if session_type == SessionType.LECTURE:
-            suitable_rooms.sort(key=lambda r: -r.capacity)
-        random.shuffle(suitable_rooms)
+        suitable_rooms = suitable_rooms[:]
+        self.rng.shuffle(suitable_rooms)
         shuffled_slots = self.time_slots[:]
-        random.shuffle(shuffled_slots)
-
-        for iid in suitable_instructors:
-            for room in suitable_rooms:
-                for ts in shuffled_slots:
-                    new_assign = Assignment(
+        self.rng.shuffle(shuffled_slots)
+        shuffled_bits = [(ts, self.slot_bits[ts.time_slot_id]) for ts in shuffled_slots]
+        # scanned[k]: the slots looked at before the k-th shuffled one
+        scanned, seen = [], 0
+        for _, bit in shuffled_bits:
+            scanned.append(seen)
+            seen |= bit
+
+        # In soft mode, look for a slot inside the instructor's preference before any other.
+        # Every candidate passed over is counted as rejected for its first clash, in the
+        # order section, instructor, preference, room; the masks below are kept disjoint for that
+        preferred_first = [True, False] if self.preference_mode == "soft" else [False]
+        section_busy = self._blocked(self.section_masks.get(section.section_id, 0))
+        key = (section.section_id, course_id, session_type.value)
+        tried = 0
+        for preferred_only in preferred_first:
+            for iid in suitable_instructors:
+                teaching = self._blocked(self.instructor_masks.get(iid, 0)) & ~section_busy
+                unpreferred = 0
+                if preferred_only or self.preference_mode == "hard":
+                    unpreferred = self.unpreferred_masks.get(iid, 0) & ~(section_busy | teaching)
+                inst_busy = section_busy | teaching | unpreferred
+                full = 0
+                for room in suitable_rooms:
+                    room_busy = self._blocked(self.room_masks.get(room.full_name, 0)) & ~inst_busy
+                    busy = inst_busy | room_busy
+                    if busy == self.all_slots_mask:
+                        full += 1
+                        self.rejections["room"] += room_busy.bit_count()
+                        continue
+                    for k, (ts, bit) in enumerate(shuffled_bits):
+                        if not busy & bit:
+                            break
+                    passed = scanned[k]
+                    self._count_rejections(full, section_busy, teaching, unpreferred)
+                    self._count_rejections(1, section_busy & passed, teaching & passed, unpreferred & passed)
+                    self.rejections["room"] += (room_busy & passed).bit_count()
+                    self._count_candidates(key, tried + full * len(shuffled_bits) + k + 1)
+                    self._add_assignment(Assignment(
                         section.section_id, course_id, iid, room.full_name, ts.time_slot_id, session_type
-                    )
-                    if self._is_valid_assignment(new_assign):
-                        self.assignments.append(new_assign)
-                        return True
+                    ))
+                    return True
+                self._count_rejections(full, section_busy, teaching, unpreferred)
+                tried += full * len(shuffled_bits)
+        self._count_candidates(key, tried)
         return False
 
+    def _count_rejections(self, times: int, section: int, instructor: int, preference: int):
+        # Add times the slots of each (disjoint) mask to the rejections for that reason
+        if times:
+            self.rejections["section"] += times * section.bit_count()
+            self.rejections["instructor"] += times * instructor.bit_count()
+            self.rejections["preference"] += times * preference.bit_count()
+
+    def _count_candidates(self, key, tried: int):
+        self.candidate_checks += tried
+        self.candidates_tried[key] = tried
+
+    def _reset_assignments(self):
+        self.assignments = []
+        self.slot_bits = {ts.time_slot_id: 1 << i for i, ts in enumerate(self.time_slots)}
+        self.all_slots_mask = (1 << len(self.time_slots)) - 1
+        self.instructor_masks = {}
+        self.room_masks = {}
+        self.section_masks = {}
+
+    def _add_assignment(self, assignment: Assignment):
+        # Keep the per-entity slot bitmasks in step with self.assignments
+        self.assignments.append(assignment)
+        bit = self.slot_bits[assignment.time_slot_id]
+        self.instructor_masks[assignment.instructor_id] = self.instructor_masks.get(assignment.instructor_id, 0) | bit
+        self.room_masks[assignment.room_full_name] = self.room_masks.get(assignment.room_full_name, 0) | bit
+        self.section_masks[assignment.section_id] = self.section_masks.get(assignment.section_id, 0) | bit
+
+    def _blocked(self, occupied: int) -> int:
+        # Slots that clash with an occupied slot: the occupied ones plus any they partially overlap
+        self.conflict_checks += 1
+        if not self.slot_overlaps or not occupied:
+            return occupied
+        blocked = occupied
+        for bit, overlap in self.slot_overlaps:
+            if occupied & bit:
+                blocked |= overlap
+        return blocked
+
+    def _instructor_busy(self, iid: str) -> int:
+        # Slots an instructor cannot take: already teaching, or outside a hard preference
+        busy = self._blocked(self.instructor_masks.get(iid, 0))
+        if self.preference_mode == "hard":
+            busy |= self.unpreferred_masks.get(iid, 0)
+        return busy
+
     def _is_valid_assignment(self, assignment: Assignment) -> bool:
+        return self._check_candidate(assignment.instructor_id, assignment.room_full_name,
+                                     assignment.section_id, assignment.time_slot_id)
+
+    def _check_candidate(self, iid: str, room_name: str, section_id: str, tsid: str) -> bool:
+        # True when the slot is free for all three; a clash is counted under its first reason
+        self.candidate_checks += 1
+        bit = self.slot_bits[tsid]
+        if self._blocked(self.section_masks.get(section_id, 0)) & bit:
+            reason = "section"
+        elif self._blocked(self.instructor_masks.get(iid, 0)) & bit:
+            reason = "instructor"
+        elif self.preference_mode == "hard" and self.unpreferred_masks.get(iid, 0) & bit:
+            reason = "preference"
+        elif self._blocked(self.room_masks.get(room_name, 0)) & bit:
+            reason = "room"
+        else:
+            return True
+        self.rejections[reason] += 1
+        return False
+
+    def _slot_positions(self):
+        # time slot id -> (day, position of the slot within that day)
+        by_day = {}
+        for ts in self.time_slots:
+            by_day.setdefault(ts.day, []).append(ts)
+        positions = {}
+        for day, slots in by_day.items():
+            slots.sort(key=lambda ts: ts.ordinal)
+            for pos, ts in enumerate(slots):
+                positions[ts.time_slot_id] = (day, pos)
+        return positions
+
+    @staticmethod
+    def _day_gaps(positions: List[int]) -> int:
+        # Idle slots between a section's first and last class of the day
+        return max(positions) - min(positions) + 1 - len(positions) if positions else 0
+
+    @staticmethod
+    def _day_overload(day_loads: Iterable[int], total: int, days: int) -> int:
+        # Sessions an instructor teaches on a day beyond an even spread of their week
+        share = -(-total // days) if days else total
+        return sum(max(0, load - share) for load in day_loads)
+
+    def _outside_preference(self, iid: str, tsid: str) -> int:
+        if self.preference_mode == "off":
+            return 0
+        return 1 if self.unpreferred_masks.get(iid, 0) & self.slot_bits[tsid] else 0
+
+    def soft_penalty(self) -> int:
+        """Soft-constraint cost of the current assignments: student gaps, uneven instructor days
+        and sessions outside an instructor's preferred slots."""
+        positions = self._slot_positions()
+        days = len({day for day, _ in positions.values()})
+        section_days = {}
+        instructor_days = {}
         for a in self.assignments:
-            if (a.instructor_id == assignment.instructor_id and a.time_slot_id == assignment.time_slot_id) or \
-               (a.room_full_name == assignment.room_full_name and a.time_slot_id == assignment.time_slot_id) or \
-               (a.section_id == assignment.section_id and a.time_slot_id == assignment.time_slot_id):
+            day, pos = positions[a.time_slot_id]
+            section_days.setdefault((a.section_id, day), []).append(pos)
+            loads = instructor_days.setdefault(a.instructor_id, {})
+            loads[day] = loads.get(day, 0) + 1
+        gaps = sum(self._day_gaps(p) for p in section_days.values())
+        overload = sum(self._day_overload(loads.values(), sum(loads.values()), days) for loads in instructor_days.values())
+        outside = sum(self._outside_preference(a.instructor_id, a.time_slot_id) for a in self.assignments)
+        return gaps + overload + outside
+
+    def _solve_cpsat(self, time_limit: float = 60.0, workers: int = None, seed: int = 0, **options):
+        """Solve with OR-Tools CP-SAT, maximising the number of placed sessions.
+
+        Every session gets slot, instructor and room variables whose domains carry the
+        role, qualification, room type and capacity rules. Two AllDifferent constraints over
+        combined (instructor, slot) and (room, slot) codes and one per section over slots
+        encode _is_valid_assignment. An unplaced session takes a private dummy code instead,
+        so over-constrained inputs still yield a best partial timetable. Instructor preferences
+        are reified (instructor, slot-set) literals. The greedy pass seeds the search with a hint.
+        When slots overlap partially, NoOverlap constraints over optional week-minute intervals
+        per section, instructor and room cover the clashes the codes cannot see.
+        """
+        try:
+            from ortools.sat.python import cp_model
+        except ImportError:
+            raise RuntimeError("The cpsat solver needs OR-Tools: pip install ortools")
+
+        self._solve_greedy()
+        hint = {(a.section_id, a.course_id, a.session_type): a for a in self.assignments}
+
+        sessions = self._build_sessions(self._required_sessions())
+        instructor_ids = list(self.instructors)
+        instructor_pos = {iid: k for k, iid in enumerate(instructor_ids)}
+        room_pos = {r.full_name: k for k, r in enumerate(self.rooms)}
+        slot_pos = {ts.time_slot_id: t for t, ts in enumerate(self.time_slots)}
+        n_slots = len(self.time_slots)
+        dummy = (max(len(instructor_ids), len(self.rooms)) + 1) * n_slots
+
+        model = cp_model.CpModel()
+        placed, slot_vars, instructor_vars, room_vars, penalties = [], [], [], [], []
+        instructor_codes, room_codes = [], []
+        section_codes = {}
+        intervals = {}
+        if self.slot_overlaps:
+            day_order = {day: k for k, day in enumerate(dict.fromkeys(ts.day for ts in self.time_slots))}
+            starts = [day_order[ts.day] * 1440 + ts.start_minute for ts in self.time_slots]
+            sizes = [ts.end_minute - ts.start_minute for ts in self.time_slots]
+        for j, sess in enumerate(sessions):
+            is_placed = model.NewBoolVar(f"placed_{j}")
+            slot = model.NewIntVar(0, n_slots - 1, f"slot_{j}")
+            inst = model.NewIntVarFromDomain(
+                cp_model.Domain.FromValues([instructor_pos[iid] for iid in sess.instructors]), f"inst_{j}")
+            room_values = [room_pos[r.full_name] for r in sess.rooms] or [0]
+            room = model.NewIntVarFromDomain(cp_model.Domain.FromValues(room_values), f"room_{j}")
+            if not sess.rooms:
+                model.Add(is_placed == 0)
+
+            codes = []
+            for name, var in (("inst", inst), ("room", room), ("section", None)):
+                code = model.NewIntVar(0, dummy + len(sessions), f"{name}_code_{j}")
+                placed_code = slot if var is None else var * n_slots + slot
+                model.Add(code == placed_code).OnlyEnforceIf(is_placed)
+                model.Add(code == dummy + j).OnlyEnforceIf(is_placed.Not())
+                codes.append(code)
+            instructor_codes.append(codes[0])
+            room_codes.append(codes[1])
+            section_codes.setdefault(sess.section.section_id, []).append(codes[2])
+
+            if self.slot_overlaps:
+                start = model.NewIntVar(0, 7 * 1440, f"start_{j}")
+                size = model.NewIntVar(0, 1440, f"size_{j}")
+                model.AddElement(slot, starts, start)
+                model.AddElement(slot, sizes, size)
+
+                def interval(key, present):
+                    end = model.NewIntVar(0, 8 * 1440, f"end_{j}")
+                    intervals.setdefault(key, []).append(
+                        model.NewOptionalIntervalVar(start, size, end, present, f"interval_{j}"))
+
+                interval(("section", sess.section.section_id), is_placed)
+                for var, positions in ((inst, [instructor_pos[iid] for iid in sess.instructors]),
+                                       (room, room_values if sess.rooms else [])):
+                    kind = "inst" if var is inst else "room"
+                    for value in positions:
+                        chosen = model.NewBoolVar(f"{kind}_{j}_{value}")
+                        model.Add(var == value).OnlyEnforceIf(chosen)
+                        model.Add(var != value).OnlyEnforceIf(chosen.Not())
+                        present = model.NewBoolVar(f"{kind}_present_{j}_{value}")
+                        model.AddBoolAnd([chosen, is_placed]).OnlyEnforceIf(present)
+                        model.AddBoolOr([chosen.Not(), is_placed.Not(), present])
+                        interval((kind, value), present)
+
+            # Preferred slots: forbid the rest in hard mode, charge one point each in soft mode
+            outside = None
+            for iid in sess.instructors:
+                mask = self.unpreferred_masks.get(iid, 0) if self.preference_mode != "off" else 0
+                if not mask:
+                    continue
+                teaches = model.NewBoolVar(f"teaches_{j}_{iid}")
+                model.Add(inst == instructor_pos[iid]).OnlyEnforceIf(teaches)
+                model.Add(inst != instructor_pos[iid]).OnlyEnforceIf(teaches.Not())
+                unpreferred = [t for t in range(n_slots) if mask >> t & 1]
+                in_unpreferred = model.NewBoolVar(f"unpreferred_{j}_{iid}")
+                model.AddLinearExpressionInDomain(slot, cp_model.Domain.FromValues(unpreferred)).OnlyEnforceIf(in_unpreferred)
+                model.AddLinearExpressionInDomain(
+                    slot, cp_model.Domain.FromValues([t for t in range(n_slots) if not mask >> t & 1])
+                ).OnlyEnforceIf(in_unpreferred.Not())
+                violation = [is_placed.Not(), teaches.Not(), in_unpreferred.Not()]
+                if self.preference_mode == "soft":
+                    if outside is None:
+                        outside = model.NewBoolVar(f"outside_{j}")
+                        penalties.append(outside)
+                    violation.append(outside)
+                model.AddBoolOr(violation)
+
+            placed.append(is_placed)
+            slot_vars.append(slot)
+            instructor_vars.append(inst)
+            room_vars.append(room)
+
+            a = hint.pop((sess.section.section_id, sess.course_id, sess.session_type), None)
+            model.AddHint(is_placed, a is not None)
+            if a is not None:
+                model.AddHint(slot, slot_pos[a.time_slot_id])
+                model.AddHint(inst, instructor_pos[a.instructor_id])
+                model.AddHint(room, room_pos[a.room_full_name])
+
+        model.AddAllDifferent(instructor_codes)
+        model.AddAllDifferent(room_codes)
+        for codes in section_codes.values():
+            model.AddAllDifferent(codes)
+        for members in intervals.values():
+            if len(members) > 1:
+                model.AddNoOverlap(members)
+        # Placing a session always outweighs any number of preference violations
+        model.Maximize((len(penalties) + 1) * sum(placed) - sum(penalties))
+
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = time_limit
+        solver.parameters.num_search_workers = workers or os.cpu_count() or 1
+        solver.parameters.random_seed = seed
+        callback = None
+        if self.progress_callback is not None:
+            system = self
+
+            class Progress(cp_model.CpSolverSolutionCallback):
+                def on_solution_callback(self):
+                    system._report_progress(phase="cpsat", placed=int(sum(self.Value(p) for p in placed)),
+                                            required=len(sessions), objective=self.ObjectiveValue(),
+                                            bound=self.BestObjectiveBound())
+
+            callback = Progress()
+        status = solver.Solve(model, callback)
+
+        stats = self.solver_stats = {
+            "status": solver.StatusName(status),
+            "best_bound": solver.BestObjectiveBound(),
+            "wall_time": solver.WallTime(),
+        }
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            self._reset_assignments()
+            for j, sess in enumerate(sessions):
+                if solver.Value(placed[j]):
+                    self._add_assignment(Assignment(
+                        sess.section.section_id, sess.course_id,
+                        instructor_ids[solver.Value(instructor_vars[j])],
+                        self.rooms[solver.Value(room_vars[j])].full_name,
+                        self.time_slots[solver.Value(slot_vars[j])].time_slot_id,
+                        sess.session_type,
+                    ))
+        else:
+            print(f" CP-SAT found no solution ({stats['status']}); keeping the greedy timetable")
+        stats["placed"] = len(self.assignments)
+        stats["unplaced"] = len(sessions) - len(self.assignments)
+        print(f" CP-SAT: {stats['status']}, {stats['placed']} placed (bound {stats['best_bound']:g}) "
+              f"in {stats['wall_time']:.1f}s")
+
+    def _solve_multistart(self, restarts: int = 8, workers: int = None, seed: int = 0, **options):
+        """Run independently seeded greedy passes in a process pool and keep the best.
+
+        Runs are ranked by sessions placed, then soft penalty, then run order, and their
+        seeds are drawn from ``seed`` so the whole batch is reproducible.
+        """
+        if restarts < 1:
+            raise ValueError(f"multistart needs at least 1 restart, got {restarts}")
+        rng = random.Random(seed)
+        seeds = [rng.getrandbits(32) for _ in range(restarts)]
+        # Create fallback instructors up front so every worker starts from the same data
+        for section, course_id, session_type in self._required_sessions():
+            self._candidate_instructors(course_id, session_type)
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_multistart_worker, initargs=(self,)) as pool:
+            results = []
+            for result in pool.map(_run_greedy_seed, seeds):
+                results.append(result)
+                self._report_progress(phase="multistart", runs=len(results), restarts=restarts,
+                                      placed=max(len(r[1]) for r in results))
+
+        best = min(range(len(results)), key=lambda k: (-len(results[k][1]), results[k][2], k))
+        best_seed, assignments, penalty = results[best]
+        self._reset_assignments()
+        for a in assignments.to_assignments():
+            self._add_assignment(a)
+        self.solver_stats = {
+            "runs": [(run_seed, len(run_assignments), run_penalty) for run_seed, run_assignments, run_penalty in results],
+            "best_seed": best_seed,
+            "placed": len(assignments),
+            "penalty": penalty,
+        }
+        print(f" Multi-start: best of {restarts} runs is seed {best_seed} "
+              f"({len(assignments)} placed, soft penalty {penalty})")
+
+    def improve_timetable(self, time_limit: float = 10.0, max_iterations: int = None, seed: int = 0):
+        """Repair and polish the current assignments with simulated annealing (see LocalSearch)."""
+        if not max_iterations and not (time_limit and time_limit > 0):
+            # Checked before LocalSearch takes over the assignments, which run() would leave behind
+            raise ValueError(f"time_limit must be positive when max_iterations is not set, got {time_limit}")
+        print(f"\nImproving timetable for up to {time_limit:g}s...")
+        self.solve_config = {**self.solve_config,
+                             "improve": {"time_limit": time_limit, "max_iterations": max_iterations, "seed": seed}}
+        with self._timed("improve"):
+            if not self._restore_solution():
+                search = LocalSearch(self, random.Random(seed))
+                self.improvement_stats = search.run(time_limit, max_iterations)
+                # Stopped by the clock rather than by the iteration budget or a zero cost: timing-dependent
+                stats = self.improvement_stats
+                self.deterministic &= stats["final_cost"] == 0 or bool(
+                    max_iterations and stats["iterations"] >= max_iterations)
+                self._store_solution()
+        self._report_unplaced()
+        stats = self.improvement_stats
+        print(f" Cost {stats['initial_cost']} -> {stats['final_cost']} after {stats['iterations']} moves, "
+              f"{stats['unplaced']} sessions unplaced")
+        return self.improvement_stats
+
+    def _pop_assignment(self):
+        # Undo the most recent _add_assignment
+        a = self.assignments.pop()
+        clear = ~self.slot_bits[a.time_slot_id]
+        self.instructor_masks[a.instructor_id] &= clear
+        self.room_masks[a.room_full_name] &= clear
+        self.section_masks[a.section_id] &= clear
+
+    def _slot_domain(self, session: Session) -> int:
+        # A slot is viable iff the section, some candidate instructor and some candidate room are all free in it
+        free = self.all_slots_mask & ~self._blocked(self.section_masks.get(session.section.section_id, 0))
+        inst_free = 0
+        for iid in session.instructors:
+            inst_free |= ~self._instructor_busy(iid)
+        room_free = 0
+        for room in session.rooms:
+            room_free |= ~self._blocked(self.room_masks.get(room.full_name, 0))
+        return free & inst_free & room_free
+
+    def _build_sessions(self, required) -> List[Session]:
+        sessions = []
+        for section, course_id, session_type in required:
+            instructors = self._candidate_instructors(course_id, session_type)
+            rooms = sorted(self._suitable_rooms(session_type, section.student_count), key=lambda r: r.capacity)
+            sessions.append(Session(section, course_id, session_type, instructors, rooms))
+        return sessions
+
+    @staticmethod
+    def _alldifferent(options: dict):
+        """Regin's filtering for sessions that each need a value of their own.
+
+        options maps a session to its candidate values (slots, or (instructor, slot) pairs).
+        Returns None when they cannot all get different values; otherwise (session -> values
+        it takes in no such assignment, values that every such assignment uses).
+        """
+        match, owner = {}, {}
+        for x, values in options.items():
+            for v in values:
+                if v not in owner:
+                    match[x], owner[v] = v, x
+                    break
+
+        def augment(root):
+            # Depth-first search for an augmenting path, shifting each session on it one value along
+            seen = set()
+            stack, via = [(root, iter(options[root]))], []
+            while stack:
+                x, values = stack[-1]
+                for v in values:
+                    if v in seen:
+                        continue
+                    seen.add(v)
+                    via.append(v)
+                    if v in owner:
+                        stack.append((owner[v], iter(options[owner[v]])))
+                        break
+                    for (x, _), v in zip(stack, via):
+                        match[x], owner[v] = v, x
+                    return True
+                else:
+                    stack.pop()
+                    if via:
+                        via.pop()
+            return False
+
+        for x in options:
+            if x not in match and not augment(x):
+                return None
+
+        # Alternating graph: unmatched edges value -> session, matched edges session -> value
+        successors = {("session", x): [("value", v)] for x, v in match.items()}
+        for x, values in options.items():
+            for v in values:
+                successors.setdefault(("value", v), [])
+                if v != match[x]:
+                    successors[("value", v)].append(("session", x))
+
+        # A value reachable from a free value can be freed, so its edges lie on some assignment
+        reachable = [node for node in successors if node[0] == "value" and node[1] not in owner]
+        seen = set(reachable)
+        while reachable:
+            for node in successors[reachable.pop()]:
+                if node not in seen:
+                    seen.add(node)
+                    reachable.append(node)
+
+        # Otherwise an unmatched edge is usable only on an alternating cycle: Tarjan's SCCs
+        index, low, component, stack, on_stack = {}, {}, {}, [], set()
+        for start in successors:
+            if start in index:
+                continue
+            index[start] = low[start] = len(index)
+            stack.append(start)
+            on_stack.add(start)
+            work = [(start, iter(successors[start]))]
+            while work:
+                node, succs = work[-1]
+                for succ in succs:
+                    if succ not in index:
+                        index[succ] = low[succ] = len(index)
+                        stack.append(succ)
+                        on_stack.add(succ)
+                        work.append((succ, iter(successors[succ])))
+                        break
+                    if succ in on_stack:
+                        low[node] = min(low[node], index[succ])
+                else:
+                    work.pop()
+                    if work:
+                        low[work[-1][0]] = min(low[work[-1][0]], low[node])
+                    if low[node] == index[node]:
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component[member] = node
+                            if member == node:
+                                break
+
+        unusable = {}
+        for x, values in options.items():
+            dropped = {v for v in values if v != match[x] and ("value", v) not in seen
+                       and component[("value", v)] != component[("session", x)]}
+            if dropped:
+                unusable[x] = dropped
+        return unusable, {v for v in owner if ("value", v) not in seen}
+
+    def _arc_consistency(self, sessions: List[Session], deadline: float = None):
+        """Prune explicit (instructor, room, slot) domains before search.
+
+        A domain is a dict slot index -> {instructor id: bitmask of allowed rooms}. Unary
+        rules (role, qualification, room type and capacity, current occupancy) seed it. Two
+        propagators then run to a fixpoint, assuming every session is to be placed:
+
+        - each section's sessions, and the sessions left with a single candidate instructor,
+          need pairwise different slots, filtered with _alldifferent. The slots such an
+          instructor is committed to in every assignment are removed for that instructor from
+          the other sessions that could use them;
+        - AC-3 on the pairwise no-overlap constraints between sessions sharing a section, an
+          instructor or a room, for sessions already down to a single slot.
+
+        Propagation stops at deadline, which leaves the domains sound but less pruned.
+        Sessions left with an empty domain are reported, and sections or instructors whose
+        sessions cannot all get a slot are listed in solver_stats['overloaded'].
+        """
+        n_slots = len(self.time_slots)
+        busy = {iid: self._instructor_busy(iid) for sess in sessions for iid in sess.instructors}
+        room_masks = {}  # room key -> bitmask of its rooms free in each slot
+        domains = []
+        for sess in sessions:
+            free = self._slot_domain(sess) if sess.rooms else 0
+            if sess.room_key not in room_masks:
+                room_busy = [(self.room_bits[room.full_name], self._blocked(self.room_masks.get(room.full_name, 0)))
+                             for room in sess.rooms]
+                room_masks[sess.room_key] = [sum(bit for bit, blocked in room_busy if not blocked >> t & 1)
+                                             for t in range(n_slots)]
+            rooms_at = room_masks[sess.room_key]
+            domains.append({
+                t: {iid: rooms_at[t] for iid in sess.instructors if not busy[iid] >> t & 1}
+                for t in range(n_slots) if free >> t & 1
+            })
+        before = sum(bin(m).count("1") for d in domains for per_slot in d.values() for m in per_slot.values())
+
+        by_section, by_instructor, by_room_key, room_keys = {}, {}, {}, {}
+        for j, sess in enumerate(sessions):
+            by_section.setdefault(sess.section.section_id, []).append(j)
+            for iid in sess.instructors:
+                by_instructor.setdefault(iid, []).append(j)
+            by_room_key.setdefault(sess.room_key, []).append(j)
+        for key, members in by_room_key.items():
+            for room in sessions[members[0]].rooms:
+                room_keys.setdefault(room.full_name, []).append(key)
+
+        clashing = [[u for u in range(n_slots) if self.slot_conflicts[ts.time_slot_id] >> u & 1]
+                    for ts in self.time_slots]
+        overloaded = set()
+
+        def drop(j, t, iid=None):
+            # Remove slot t from x_j, or only instructor iid at slot t
+            if iid is None:
+                del domains[j][t]
+            else:
+                del domains[j][t][iid]
+                if not domains[j][t]:
+                    del domains[j][t]
+
+        # Sessions linked through shared candidate instructors compete for (instructor, slot) pairs
+        instructor_groups, grouped = [], set()
+        for j in range(len(sessions)):
+            if j in grouped or not sessions[j].instructors:
+                continue
+            group, todo, reached = [], [j], set(sessions[j].instructors)
+            grouped.add(j)
+            while todo:
+                k = todo.pop()
+                group.append(k)
+                for iid in sessions[k].instructors:
+                    for m in by_instructor[iid]:
+                        if m not in grouped:
+                            grouped.add(m)
+                            todo.append(m)
+            instructor_groups.append(group)
+
+        def filter_groups():
+            # One pass of the all-different propagators; returns the sessions it changed
+            changed = set()
+            for sid, members in by_section.items():
+                result = self._alldifferent({j: domains[j].keys() for j in members if domains[j]})
+                if result is None:
+                    overloaded.add(("section", sid))
+                    continue
+                for j, slots in result[0].items():
+                    for t in slots:
+                        drop(j, t)
+                    changed.add(j)
+            for members in instructor_groups:
+                result = self._alldifferent({
+                    j: [(iid, t) for t, per_slot in domains[j].items() for iid in per_slot]
+                    for j in members if domains[j]
+                })
+                if result is None:
+                    overloaded.add(("instructors", min(sessions[members[0]].instructors)))
+                    continue
+                unusable, committed = result
+                for j, pairs in unusable.items():
+                    for iid, t in pairs:
+                        if t in domains[j] and iid in domains[j][t]:
+                            drop(j, t, iid)
+                    changed.add(j)
+                # An instructor committed to slot t is also lost to the slots partially overlapping it
+                for iid, t in committed:
+                    for u in clashing[t]:
+                        if u == t:
+                            continue
+                        for j in by_instructor[iid]:
+                            if u in domains[j] and iid in domains[j][u]:
+                                drop(j, u, iid)
+                                changed.add(j)
+            return changed
+
+        def neighbours(j):
+            # Sessions x_j can bind once it is down to one slot: its section's, and those
+            # sharing an instructor or a room it still has there
+            (t, support), = domains[j].items()
+            found = set(by_section[sessions[j].section.section_id])
+            rooms = 0
+            for iid, mask in support.items():
+                found.update(by_instructor[iid])
+                rooms |= mask
+            for room in sessions[j].rooms:
+                if rooms & self.room_bits[room.full_name]:
+                    for key in room_keys[room.full_name]:
+                        found.update(by_room_key[key])
+            found.discard(j)
+            return found
+
+        def revise(i, j):
+            # x_j withdraws support from a value of x_i when all of x_j's values clash with it.
+            # That is only checked once x_j is down to one slot, so with partially overlapping
+            # slots (several slots of x_j can clash with the same u) the check is sound but not exact
+            if len(domains[j]) != 1:
                 return False
-        return True
+            (t, support), = domains[j].items()
+            domain = domains[i]
+            changed = False
+            for u in clashing[t]:
+                if u not in domain:
+                    continue
+                if sessions[i].section is sessions[j].section:
+                    del domain[u]
+                    changed = True
+                    continue
+                for iid in list(domain[u]):
+                    rooms = 0
+                    for other, mask in support.items():
+                        if other != iid:
+                            rooms |= mask
+                    if rooms & (rooms - 1):
+                        continue  # two or more supporting rooms: every room of x_i keeps a support
+                    kept = domain[u][iid] & ~rooms if rooms else 0
+                    if kept != domain[u][iid]:
+                        changed = True
+                        if kept:
+                            domain[u][iid] = kept
+                        else:
+                            del domain[u][iid]
+                if not domain[u]:
+                    del domain[u]
+            return changed
+
+        def timed_out():
+            if deadline is not None and time.monotonic() > deadline:
+                self.solver_stats["propagation_timed_out"] = True
+                return True
+            return False
 
-    def generate_main_timetable(self):
-        html = f"""<!DOCTYPE html>
+        singles = [j for j, d in enumerate(domains) if len(d) == 1]
+        while not timed_out():
+            queue = deque((i, j) for j in singles if len(domains[j]) == 1 for i in neighbours(j))
+            revised = set()
+            while queue:
+                if timed_out():
+                    break
+                i, j = queue.popleft()
+                if not domains[i] or not revise(i, j):
+                    continue
+                revised.add(i)
+                if len(domains[i]) == 1:
+                    queue.extend((k, i) for k in neighbours(i) if k != j)
+            changed = filter_groups()
+            if not changed:
+                break
+            singles = [j for j in changed | revised if len(domains[j]) == 1]
+
+        after = sum(bin(m).count("1") for d in domains for per_slot in d.values() for m in per_slot.values())
+        self.solver_stats["pruned_values"] = before - after
+        self.solver_stats["overloaded"] = sorted(overloaded)
+        empty = [sess for sess, d in zip(sessions, domains) if not d]
+        self.solver_stats["empty_domains"] = [
+            (sess.section.section_id, sess.course_id, sess.session_type.value) for sess in empty
+        ]
+        for sess in empty:
+            print(f" No feasible (instructor, room, slot) for {sess.section.section_id} "
+                  f"{sess.course_id} ({sess.session_type.value})")
+        return domains
+
+    def _solve_backtracking(self, time_limit: float = 60.0, **options) -> bool:
+        """Chronological backtracking with MRV/degree ordering, LCV values and forward checking.
+
+        Domains are kept per session as a bitmask of viable slots, which is exact because
+        instructor, room and section clashes depend only on the slots a placement overlaps. Forward
+        checking keeps per-slot counts of free candidate instructors and rooms, so a placement only
+        touches the sessions it actually takes a slot from.
+
+        Leaving a session unplaced is the last value of every session, so one session that
+        cannot be placed no longer sends the search through the whole tree. Each complete
+        timetable found bounds the next ones to fewer unplaced sessions (branch and bound),
+        and a branch is cut once its unplaced sessions plus those left without any slot exceed
+        that bound. Returns True when every placeable session was assigned; otherwise the
+        timetable placing the most sessions is kept and completed greedily.
+        """
+        deadline = time.monotonic() + time_limit if time_limit else None
+        self._reset_assignments()
+        stats = self.solver_stats = {"nodes": 0, "backtracks": 0, "timed_out": False, "unplaced": 0}
+
+        required = self._required_sessions()
+        sessions = self._build_sessions(required)
+        stats["propagation_seconds"] = -time.monotonic()
+        ac_domains = self._arc_consistency(sessions, deadline)
+        stats["propagation_seconds"] += time.monotonic()
+
+        by_section, by_instructor, by_room_key, room_keys = {}, {}, {}, {}
+        for j, sess in enumerate(sessions):
+            by_section.setdefault(sess.section.section_id, []).append(j)
+            for iid in sess.instructors:
+                by_instructor.setdefault(iid, []).append(j)
+            by_room_key.setdefault(sess.room_key, []).append(j)
+        for key, members in by_room_key.items():
+            for room in sessions[members[0]].rooms:
+                room_keys.setdefault(room.full_name, []).append(key)
+
+        # Free candidate instructors per instructor list and free candidate rooms per room key in
+        # each slot; assign() and undo() keep them in step with the search
+        by_candidates, instructor_keys = {}, {}
+        for j, sess in enumerate(sessions):
+            by_candidates.setdefault((sess.course_id, sess.session_type), []).append(j)
+        for key, members in by_candidates.items():
+            for iid in sessions[members[0]].instructors:
+                instructor_keys.setdefault(iid, []).append(key)
+
+        def slot_indexes(mask):
+            return [t for t in range(len(self.time_slots)) if mask >> t & 1]
+
+        def free_counts(busy_masks):
+            return [sum(1 for busy in busy_masks if not busy >> t & 1) for t in range(len(self.time_slots))]
+
+        free_instructors = {
+            key: free_counts([self._instructor_busy(iid) for iid in sessions[members[0]].instructors])
+            for key, members in by_candidates.items()
+        }
+        free_rooms = {
+            key: free_counts([self._blocked(self.room_masks.get(room.full_name, 0)) for room in sessions[members[0]].rooms])
+            for key, members in by_room_key.items()
+        }
+
+        degree = []
+        for j, sess in enumerate(sessions):
+            neighbours = set(by_section[sess.section.section_id])
+            for iid in sess.instructors:
+                neighbours.update(by_instructor[iid])
+            degree.append(len(neighbours) - 1)
+
+        domains = [self._slot_domain(sess) for sess in sessions]
+        for j, ac in enumerate(ac_domains):
+            domains[j] &= sum(1 << t for t in ac)
+        unassigned = set(range(len(sessions)))
+        unassigned.difference_update([j for j in unassigned if not domains[j]])
+        # Sessions left unplaced on the current branch, unassigned sessions whose domain is
+        # wiped out, and the most unplaced sessions a branch may still end with
+        skipped = wiped = 0
+        bound = len(sessions)
+
+        def conflicts(members, j, bit):
+            return sum(1 for k in members if k != j and k in unassigned and domains[k] & bit)
+
+        def order_values(j):
+            sess = sessions[j]
+            section_members = by_section[sess.section.section_id]
+            candidates = []
+            for t, ts in enumerate(self.time_slots):
+                bit = 1 << t
+                if not domains[j] & bit:
+                    continue
+                section_cost = conflicts(section_members, j, bit)
+                for iid in sess.instructors:
+                    if iid in ac_domains[j][t] and not self._instructor_busy(iid) & bit:
+                        outside = self._outside_preference(iid, ts.time_slot_id)
+                        candidates.append((outside, section_cost + conflicts(by_instructor[iid], j, bit), t, iid))
+            candidates.sort()
+            for _, _, t, iid in candidates:
+                bit = 1 << t
+                allowed = ac_domains[j][t][iid]
+                for room in sess.rooms:
+                    if (allowed & self.room_bits[room.full_name]
+                            and not self._blocked(self.room_masks.get(room.full_name, 0)) & bit):
+                        yield iid, room, self.time_slots[t]
+            yield None  # leave the session unplaced
+
+        def prune(pruned, members, lost):
+            # Drop the lost slots from unassigned members, counting the domains wiped out
+            nonlocal wiped
+            for k in members:
+                if k in unassigned and domains[k] & lost:
+                    pruned.append((k, domains[k]))
+                    domains[k] &= ~lost
+                    if not domains[k]:
+                        wiped += 1
+
+        def skip(j):
+            # Leave x_j unplaced; an empty trail tells undo() so
+            nonlocal skipped, wiped
+            unassigned.discard(j)
+            skipped += 1
+            if not domains[j]:
+                wiped -= 1
+            if skipped + wiped > bound:
+                undo(j, ())
+                return None
+            return ()
+
+        def assign(j, iid, room, ts):
+            sess = sessions[j]
+            clash = self.slot_conflicts[ts.time_slot_id]
+            # Slots the instructor and the room were still free in before this placement
+            instructor_lost = clash & ~self._instructor_busy(iid)
+            room_lost = clash & ~self._blocked(self.room_masks.get(room.full_name, 0))
+            self._add_assignment(Assignment(
+                sess.section.section_id, sess.course_id, iid, room.full_name, ts.time_slot_id, sess.session_type
+            ))
+            unassigned.discard(j)
+
+            # The section loses every clashing slot; sessions sharing the instructor or the room
+            # only lose a slot once the last free candidate they had there is taken
+            pruned, taken = [], []
+            prune(pruned, by_section[sess.section.section_id], clash)
+            for free, groups, keys, lost in ((free_instructors, by_candidates, instructor_keys[iid], instructor_lost),
+                                             (free_rooms, by_room_key, room_keys[room.full_name], room_lost)):
+                for key in keys:
+                    counts, gone = free[key], 0
+                    for t in slot_indexes(lost):
+                        counts[t] -= 1
+                        taken.append((counts, t))
+                        if not counts[t]:
+                            gone |= 1 << t
+                    if gone:
+                        prune(pruned, groups[key], gone)
+            if skipped + wiped > bound:
+                undo(j, (pruned, taken))
+                return None
+            return pruned, taken
+
+        def undo(j, trail):
+            nonlocal skipped, wiped
+            unassigned.add(j)
+            if not trail:
+                skipped -= 1
+                if not domains[j]:
+                    wiped += 1
+                return
+            pruned, taken = trail
+            for k, dom in reversed(pruned):
+                if not domains[k]:
+                    wiped -= 1
+                domains[k] = dom
+            for counts, t in taken:
+                counts[t] += 1
+            self._pop_assignment()
+
+        def select():
+            return min(unassigned, key=lambda k: (domains[k].bit_count(), -degree[k], k))
+
+        best = []
+        stack = []
+        if unassigned:
+            j = select()
+            stack.append([j, order_values(j), None])
+        while stack:
+            if deadline is not None and time.monotonic() > deadline:
+                stats["timed_out"] = True
+                break
+            self._report_progress(phase="backtracking", placed=len(self.assignments), required=len(sessions),
+                                  nodes=stats["nodes"], backtracks=stats["backtracks"])
+            frame = stack[-1]
+            j, values, trail = frame
+            if trail is not None:
+                undo(j, trail)
+                frame[2] = None
+            for value in values:
+                stats["nodes"] += 1
+                trail = assign(j, *value) if value else skip(j)
+                if trail is not None:
+                    frame[2] = trail
+                    break
+            else:
+                stack.pop()
+                stats["backtracks"] += 1
+                continue
+
+            if len(self.assignments) > len(best):
+                best = self.assignments[:]
+            if not unassigned:
+                if not skipped:
+                    break
+                # A complete timetable: from now on only look for ones leaving fewer unplaced
+                bound = skipped - 1
+                continue
+            j = select()
+            stack.append([j, order_values(j), None])
+
+        if unassigned or skipped:
+            # Not everything placed, or the search ended elsewhere: keep the timetable that placed
+            # the most sessions and let the greedy pass place whatever still fits around it
+            self._reset_assignments()
+            for a in best:
+                self._add_assignment(a)
+            placed = {(a.section_id, a.course_id, a.session_type) for a in best}
+            for section, course_id, session_type in required:
+                if (section.section_id, course_id, session_type) not in placed:
+                    self._assign_session(section, course_id, session_type)
+        stats["unplaced"] = len(required) - len(self.assignments)
+        print(f" Backtracking: {stats['nodes']} nodes, {stats['backtracks']} backtracks"
+              f"{' (time limit reached)' if stats['timed_out'] else ''}")
+        if stats["unplaced"]:
+            print(f" Could not place {stats['unplaced']} sessions")
+        return stats["unplaced"] == 0
+
+    @staticmethod
+    def _section_sort_key(sec: Section):
+        # Level, then specialization, then section number
+        level_order = {"L1": 1, "L2": 2, "L3": 3, "L4": 4}
+        spec_order = {"Common": 0, "AID": 1, "CNC": 2, "CSC": 3, "BIF": 4, "General": 5}
+        sec_num = 0
+        if "_L1" in sec.section_id:
+            sec_num = int(sec.section_id.split('_')[0][1:])
+        elif "_L2" in sec.section_id:
+            sec_num = int(sec.section_id.split('_')[0][1:]) + 100
+        elif "_L3" in sec.section_id:
+            sec_num = int(sec.section_id.split('_')[0][1:]) + 200
+        elif "_L4" in sec.section_id:
+            sec_num = int(sec.section_id.split('_')[0][1:]) + 300
+        return (level_order.get(sec.level, 99), spec_order.get(sec.specialization, 99), sec_num)
+
+    def payload(self) -> dict:
+        """The timetable as compact lookup tables plus rows of indexes into them, for the web pages.
+
+        Each assignment is [section, course, instructor, room, slot, session type], with slots in
+        week order and the rows sorted by slot, so a page can group them by day without sorting.
+        Sections and rooms are listed in display order. Sessions left out are listed as
+        [section, course, session type, blocker], and meta is solution_metadata().
+        """
+        slots = sorted(self.time_slots, key=lambda ts: ts.ordinal)
+        days = list(dict.fromkeys(ts.day for ts in slots))
+        sections = sorted(self.sections, key=self._section_sort_key)
+        rooms = sorted(self.rooms, key=lambda r: (r.building, r.space))
+        courses = list(self.courses.values())
+        unplaced = self.unplaced_sessions()
+        instructors = list(self.instructors.values())
+        roles = list(InstructorRole)
+        types = list(SessionType)
+        blockers = list(self.UNPLACED_BLOCKERS)
+
+        day_pos = {day: k for k, day in enumerate(days)}
+        slot_pos = {ts.time_slot_id: k for k, ts in enumerate(slots)}
+        section_pos = {sec.section_id: k for k, sec in enumerate(sections)}
+        room_pos = {r.full_name: k for k, r in enumerate(rooms)}
+        course_pos = {c.course_id: k for k, c in enumerate(courses)}
+        instructor_pos = {inst.instructor_id: k for k, inst in enumerate(instructors)}
+        type_pos = {t: k for k, t in enumerate(types)}
+        rows = sorted(([section_pos[a.section_id], course_pos[a.course_id], instructor_pos[a.instructor_id],
+                        room_pos[a.room_full_name], slot_pos[a.time_slot_id], type_pos[a.session_type]]
+                       for a in self.assignments), key=lambda row: row[4])
+        return {
+            "version": 1,
+            "generated": datetime.now().strftime('%B %d, %Y at %I:%M %p'),
+            "days": days,
+            "types": [t.value for t in types],
+            "roles": [r.value for r in roles],
+            "slots": [[day_pos[ts.day], ts.start_time, ts.end_time] for ts in slots],
+            "courses": [[c.course_id, c.name] for c in courses],
+            "instructors": [[inst.instructor_id, inst.name, roles.index(inst.role)] for inst in instructors],
+            "rooms": [[r.full_name, r.building, r.space, r.capacity] for r in rooms],
+            "sections": [[sec.section_id, sec.level, sec.specialization] for sec in sections],
+            "assignments": rows,
+            "blockers": blockers,
+            "unplaced": [[section_pos[u["section"]], course_pos[u["course"]], type_pos[SessionType(u["type"])],
+                          blockers.index(u["blocker"])] for u in unplaced],
+            "meta": self.solution_metadata(),
+        }
+
+    def render_payload(self):
+        """Yield timetable.json, the payload the report pages fetch and render."""
+        yield json.dumps(self.payload(), ensure_ascii=False, separators=(",", ":"))
+
+    @staticmethod
+    def _page_script(mount: str):
+        # Inline the shared renderer so a page needs nothing beside it but timetable.json
+        with open(TIMETABLE_JS, encoding="utf-8") as f:
+            yield "<script>\n" + f.read() + "</script>\n"
+        yield f"<script>\n{mount}\n</script>\n</body></html>\n"
+
+    @staticmethod
+    def _write_report(path: str, chunks: Iterable[str]):
+        # The render_* generators yield a page piece by piece; writing them through a buffered
+        # file keeps memory flat instead of holding the whole page as one string
+        with open(path, "w", encoding="utf-8", buffering=1 << 16) as f:
+            f.writelines(chunks)
+
+    def render_main_timetable(self):
+        """Yield timetable.html as chunks of HTML, e.g. for a streaming HTTP response."""
+        yield f"""<!DOCTYPE html>
 <html lang="en">
 <head>
 <meta charset="UTF-8">
 <meta name="viewport" content="width=device-width, initial-scale=1.0">
-<title>E-JUST CSIT Timetable — {datetime.now().strftime('%Y-%m-%d')}</title>
+<title>E-JUST CSIT Timetable</title>
 <style>
 * {{ box-sizing: border-box; margin: 0; padding: 0; }}
 body {{
@@ -454,7 +2235,7 @@ select {{
 <div class="container">
   <div class="header">
     <h1>🎓 E-JUST CSIT Timetable</h1>
-    <p>Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}</p>
+    <p>Generated on <span id="generatedOn"></span></p>
   </div>
   <div class="filters">
     <select id="levelFilter">
@@ -478,160 +2259,19 @@ select {{
   </div>
 """
 
-        days = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday"]
-        time_slot_map = {ts.time_slot_id: ts for ts in self.time_slots}
-
-        spec_names = {
-            "AID": "Artificial Intelligence & Data Science",
-            "CNC": "Cybersecurity",
-            "CSC": "Computer Science",
-            "BIF": "Bioinformatics"
-        }
-
-        def section_sort_key(sec):
-            level_order = {"L1": 1, "L2": 2, "L3": 3, "L4": 4}
-            spec_order = {"Common": 0, "AID": 1, "CNC": 2, "CSC": 3, "BIF": 4, "General": 5}
-            sec_num = 0
-            if "_L1" in sec.section_id:
-                sec_num = int(sec.section_id.split('_')[0][1:])
-            elif "_L2" in sec.section_id:
-                sec_num = int(sec.section_id.split('_')[0][1:]) + 100
-            elif "_L3" in sec.section_id:
-                sec_num = int(sec.section_id.split('_')[0][1:]) + 200
-            elif "_L4" in sec.section_id:
-                sec_num = int(sec.section_id.split('_')[0][1:]) + 300
-            return (level_order.get(sec.level, 99), spec_order.get(sec.specialization, 99), sec_num)
-
-        sorted_sections = sorted(self.sections, key=section_sort_key)
-
-        current_level = None
-        for section in sorted_sections:
-            sec_assigns = [a for a in self.assignments if a.section_id == section.section_id]
-            if not sec_assigns:
-                continue
-
-            if section.level != current_level:
-                if current_level is not None:
-                    html += "</div>"
-                html += f'<div class="level-card" data-level="{section.level}"><div class="level-header">Level {section.level}</div>'
-                current_level = section.level
-
-            spec_name = spec_names.get(section.specialization, section.specialization)
-            section_number = section.section_id.split('_')[0][1:] 
-            section_display = f"Section {section_number}"
-            html += f'<div class="section-card" data-section="{section.section_id}" data-specialization="{section.specialization}">'
-            html += f'<div class="section-header">{section_display} — {spec_name}</div>'
-            html += '<div class="days-container">'
-
-            for day in days:
-                html += f'<div class="day-card"><div class="day-header">{day}</div>'
-                day_assigns = [a for a in sec_assigns if time_slot_map[a.time_slot_id].day == day]
-
-                if not day_assigns:
-                    html += '<div class="empty">No classes</div>'
-                else:
-                    def get_start_time(assignment):
-                        ts = time_slot_map[assignment.time_slot_id]
-                        return datetime.strptime(ts.start_time, "%I:%M %p").time()
-                    day_assigns.sort(key=get_start_time)
-
-                    for a in day_assigns:
-                        course = self.courses[a.course_id]
-                        inst = self.instructors.get(a.instructor_id, type('obj', (object,), {'name': 'Unknown'}))
-                        ts = time_slot_map[a.time_slot_id]
-                        session_label = a.session_type.value
-                        session_class = a.session_type.name.lower()
-
-                        html += f"""
-                        <div class="assignment {session_class}">
-                          <span class="course-title">{course.name} ({a.course_id})</span>
-                          <span class="details">
-                            {ts.start_time} – {ts.end_time}<br>
-                            👨‍🏫 {inst.name}<br>
-                            📍 {a.room_full_name}<br>
-                            {"📘 " + session_label}
-                          </span>
-                        </div>
-                        """
-                html += "</div>"
-            html += "</div></div>"
-
-        if current_level is not None:
-            html += "</div>"
-
-        html += """
+        yield """
+  <div id="timetable"></div>
 </div>
-
-<script>
-document.addEventListener('DOMContentLoaded', function() {
-    const levelFilter = document.getElementById('levelFilter');
-    const specFilter = document.getElementById('specializationFilter');
-    const sectionFilter = document.getElementById('sectionFilter');
-    const sectionCards = document.querySelectorAll('.section-card');
-    const allSections = Array.from(sectionCards).map(card => ({
-        id: card.dataset.section,
-        level: card.closest('.level-card').dataset.level,
-        spec: card.dataset.specialization
-    }));
-
-    function populateSectionFilter() {
-        sectionFilter.innerHTML = '<option value="all">All Sections</option>';
-        const filtered = allSections.filter(s => 
-            (levelFilter.value === 'all' || s.level === levelFilter.value) &&
-            (specFilter.value === 'all' || s.spec === specFilter.value)
-        );
-        const unique = [...new Set(filtered.map(s => s.id))].sort();
-        unique.forEach(id => {
-            const opt = document.createElement('option');
-            opt.value = id;
-            // Simplify display: S1_L1 → Section 1
-            const num = id.split('_')[0].substring(1);
-            opt.textContent = `Section ${num}`;
-            sectionFilter.appendChild(opt);
-        });
-    }
-
-    function applyFilters() {
-        const level = levelFilter.value;
-        const spec = specFilter.value;
-        const section = sectionFilter.value;
-
-        sectionCards.forEach(card => {
-            const cardLevel = card.closest('.level-card').dataset.level;
-            const cardSpec = card.dataset.specialization;
-            const cardSection = card.dataset.section;
-
-            let show = true;
-            if (level !== 'all' && cardLevel !== level) show = false;
-            if (spec !== 'all' && cardSpec !== spec) show = false;
-            if (section !== 'all' && cardSection !== section) show = false;
-
-            card.style.display = show ? 'block' : 'none';
-        });
-    }
-
-    levelFilter.addEventListener('change', () => {
-        populateSectionFilter();
-        applyFilters();
-    });
-    specFilter.addEventListener('change', () => {
-        populateSectionFilter();
-        applyFilters();
-    });
-    sectionFilter.addEventListener('change', applyFilters);
-
-    populateSectionFilter();
-});
-</script>
-</body></html>
 """
-        with open("timetable.html", "w", encoding="utf-8") as f:
-            f.write(html)
+        yield from self._page_script("Timetable.mountSections(document.getElementById('timetable'));")
+
+    def generate_main_timetable(self):
+        self._write_report("timetable.html", self.render_main_timetable())
         print("Main timetable saved as 'timetable.html'")
 
-    def generate_professors_timetable(self):
-        professors = {iid: inst for iid, inst in self.instructors.items() if inst.role == InstructorRole.PROFESSOR}
-        html = f"""<!DOCTYPE html>
+    def render_professors_timetable(self):
+        """Yield professors.html as chunks of HTML."""
+        yield f"""<!DOCTYPE html>
 <html lang="en">
 <head>
 <meta charset="UTF-8">
@@ -729,86 +2369,27 @@ body {{
 <div class="container">
   <div class="header">
     <h1>👨‍🏫 E-JUST Professors Timetable</h1>
-    <p>Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}</p>
+    <p>Generated on <span id="generatedOn"></span></p>
   </div>
   <div class="filters">
     <select id="profFilter">
       <option value="all">Select Professor</option>
-"""
-        prof_list = sorted([(inst.name, iid) for iid, inst in professors.items()])
-        for name, iid in prof_list:
-            html += f'<option value="{iid}">{name}</option>'
-        html += """
     </select>
   </div>
-"""
-
-        days = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday"]
-        time_slot_map = {ts.time_slot_id: ts for ts in self.time_slots}
-
-        for iid, inst in professors.items():
-            prof_assigns = [a for a in self.assignments if a.instructor_id == iid]
-            if not prof_assigns:
-                continue
-
-            html += f'<div class="prof-card" data-prof="{iid}">'
-            html += f'<div class="prof-header">{inst.name}</div>'
-            html += '<div class="days-container">'
-
-            for day in days:
-                html += f'<div class="day-card"><div class="day-header">{day}</div>'
-                day_assigns = [a for a in prof_assigns if time_slot_map[a.time_slot_id].day == day]
-
-                if not day_assigns:
-                    html += '<div class="empty">Free</div>'
-                else:
-                    def get_start_time(assignment):
-                        ts = time_slot_map[assignment.time_slot_id]
-                        return datetime.strptime(ts.start_time, "%I:%M %p").time()
-                    day_assigns.sort(key=get_start_time)
-
-                    for a in day_assigns:
-                        course = self.courses[a.course_id]
-                        section = a.section_id
-                        ts = time_slot_map[a.time_slot_id]
-                        session_label = a.session_type.value
-
-                        html += f"""
-                        <div class="assignment">
-                          <span class="course-title">{course.name} ({a.course_id})</span>
-                          <span class="details">
-                            {ts.start_time} – {ts.end_time}<br>
-                            👥 {section}<br>
-                            📍 {a.room_full_name}<br>
-                            {"📘 " + session_label}
-                          </span>
-                        </div>
-                        """
-                html += "</div>"
-            html += "</div></div>"
-
-        html += """
+  <div id="timetable"></div>
 </div>
-<script>
-document.getElementById('profFilter').addEventListener('change', function() {
-    const selected = this.value;
-    document.querySelectorAll('.prof-card').forEach(card => {
-        card.style.display = (selected === 'all' || card.dataset.prof === selected) ? 'block' : 'none';
-    });
-});
-</script>
-</body></html>
 """
-        with open("professors.html", "w", encoding="utf-8") as f:
-            f.write(html)
-        print(" Professors timetable saved as 'professors.html'")
+        yield from self._page_script(
+            "Timetable.mountInstructors(document.getElementById('timetable'), "
+            "{role: 'Professor', filter: 'profFilter', cardClass: 'prof'});")
 
-    def generate_assistants_timetable(self):
-        assistants = {iid: inst for iid, inst in self.instructors.items() if inst.role == InstructorRole.ASSISTANT_PROFESSOR}
-        # 🔹 Filter out "Unknown Instructor"
-        assistants = {iid: inst for iid, inst in assistants.items() if inst.name != "Unknown Instructor"}
+    def generate_professors_timetable(self):
+        self._write_report("professors.html", self.render_professors_timetable())
+        print(" Professors timetable saved as 'professors.html'")
 
-        html = f"""<!DOCTYPE html>
+    def render_assistants_timetable(self):
+        """Yield assistants.html as chunks of HTML."""
+        yield f"""<!DOCTYPE html>
 <html lang="en">
 <head>
 <meta charset="UTF-8">
@@ -912,82 +2493,27 @@ body {{
 <div class="container">
   <div class="header">
     <h1>👩‍🏫 E-JUST Assistant Professors Timetable</h1>
-    <p>Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}</p>
+    <p>Generated on <span id="generatedOn"></span></p>
   </div>
   <div class="filters">
     <select id="assistantFilter">
       <option value="all">Select Assistant Professor</option>
-"""
-        ass_list = sorted([(inst.name, iid) for iid, inst in assistants.items()])
-        for name, iid in ass_list:
-            html += f'<option value="{iid}">{name}</option>'
-        html += """
     </select>
   </div>
-"""
-
-        days = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday"]
-        time_slot_map = {ts.time_slot_id: ts for ts in self.time_slots}
-
-        for iid, inst in assistants.items():
-            ass_assigns = [a for a in self.assignments if a.instructor_id == iid]
-            if not ass_assigns:
-                continue
-
-            html += f'<div class="assistant-card" data-assistant="{iid}">'
-            html += f'<div class="assistant-header">{inst.name}</div>'
-            html += '<div class="days-container">'
-
-            for day in days:
-                html += f'<div class="day-card"><div class="day-header">{day}</div>'
-                day_assigns = [a for a in ass_assigns if time_slot_map[a.time_slot_id].day == day]
-
-                if not day_assigns:
-                    html += '<div class="empty">Free</div>'
-                else:
-                    def get_start_time(assignment):
-                        ts = time_slot_map[assignment.time_slot_id]
-                        return datetime.strptime(ts.start_time, "%I:%M %p").time()
-                    day_assigns.sort(key=get_start_time)
-
-                    for a in day_assigns:
-                        course = self.courses[a.course_id]
-                        section = a.section_id
-                        ts = time_slot_map[a.time_slot_id]
-                        session_label = a.session_type.value
-
-                        html += f"""
-                        <div class="assignment {a.session_type.name.lower()}">
-                          <span class="course-title">{course.name} ({a.course_id})</span>
-                          <span class="details">
-                            {ts.start_time} – {ts.end_time}<br>
-                            👥 {section}<br>
-                            📍 {a.room_full_name}<br>
-                            {"📘 " + session_label}
-                          </span>
-                        </div>
-                        """
-                html += "</div>"
-            html += "</div></div>"
-
-        html += """
+  <div id="timetable"></div>
 </div>
-<script>
-document.getElementById('assistantFilter').addEventListener('change', function() {
-    const selected = this.value;
-    document.querySelectorAll('.assistant-card').forEach(card => {
-        card.style.display = (selected === 'all' || card.dataset.assistant === selected) ? 'block' : 'none';
-    });
-});
-</script>
-</body></html>
 """
-        with open("assistants.html", "w", encoding="utf-8") as f:
-            f.write(html)
+        yield from self._page_script(
+            "Timetable.mountInstructors(document.getElementById('timetable'), "
+            "{role: 'Assistant Professor', filter: 'assistantFilter', cardClass: 'assistant', hideUnknown: true});")
+
+    def generate_assistants_timetable(self):
+        self._write_report("assistants.html", self.render_assistants_timetable())
         print("Assistant Professors timetable saved as 'assistants.html'")
 
-    def generate_rooms_timetable(self):
-        html = f"""<!DOCTYPE html>
+    def render_rooms_timetable(self):
+        """Yield rooms.html as chunks of HTML."""
+        yield f"""<!DOCTYPE html>
 <html lang="en">
 <head>
 <meta charset="UTF-8">
@@ -1096,153 +2622,500 @@ select {{
 <div class="container">
   <div class="header">
     <h1>🏢 E-JUST Rooms Timetable</h1>
-    <p>Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}</p>
+    <p>Generated on <span id="generatedOn"></span></p>
   </div>
   <div class="filters">
     <select id="buildingFilter">
       <option value="all">All Buildings</option>
-"""
-        buildings = sorted(set(r.building for r in self.rooms))
-        for b in buildings:
-            html += f'<option value="{b}">{b}</option>'
-        html += """
     </select>
     <select id="roomFilter">
       <option value="all">All Rooms</option>
     </select>
   </div>
-"""
-
-        days = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday"]
-        time_slot_map = {ts.time_slot_id: ts for ts in self.time_slots}
-
-        rooms_by_building = {}
-        for r in self.rooms:
-            rooms_by_building.setdefault(r.building, []).append(r)
-        for b in rooms_by_building:
-            rooms_by_building[b].sort(key=lambda r: r.space)
-
-        for building in sorted(rooms_by_building.keys()):
-            html += f'<div class="building-card" data-building="{building}">'
-            html += f'<div class="building-header">{building}</div>'
-
-            for room in rooms_by_building[building]:
-                html += f'<div class="room-card" data-room="{room.full_name}" data-building="{building}">'
-                html += f'<div class="room-header">{room.space} ({room.capacity} seats)</div>'
-                html += '<div class="days-container">'
-
-                for day in days:
-                    html += f'<div class="day-card"><div class="day-header">{day}</div>'
-                    room_day_assigns = [
-                        a for a in self.assignments
-                        if a.room_full_name == room.full_name and time_slot_map[a.time_slot_id].day == day
-                    ]
-                    day_slots = [ts for ts in self.time_slots if ts.day == day]
-                    day_slots.sort(key=lambda ts: datetime.strptime(ts.start_time, "%I:%M %p").time())
-
-                    if not day_slots:
-                        html += '<div class="free">No schedule</div>'
-                    else:
-                        used_slots = {a.time_slot_id for a in room_day_assigns}
-                        for ts in day_slots:
-                            if ts.time_slot_id in used_slots:
-                                assign = next(a for a in room_day_assigns if a.time_slot_id == ts.time_slot_id)
-                                course = self.courses[assign.course_id]
-                                inst = self.instructors.get(assign.instructor_id, type('obj', (object,), {'name': 'Unknown'}))
-                                html += f"""
-                                <div class="occupied">
-                                  {ts.start_time} – {ts.end_time}<br>
-                                  {course.name} ({assign.course_id})<br>
-                                  👨‍🏫 {inst.name} | 👥 {assign.section_id}
-                                </div>
-                                """
-                            else:
-                                html += f'<div class="free">{ts.start_time} – {ts.end_time} — FREE</div>'
-                    html += "</div>"
-                html += "</div></div>"
-            html += "</div>"
-
-        html += """
+  <div id="timetable"></div>
 </div>
+"""
+        yield from self._page_script("Timetable.mountRooms(document.getElementById('timetable'));")
 
-<script>
-document.addEventListener('DOMContentLoaded', function() {
-    const buildingFilter = document.getElementById('buildingFilter');
-    const roomFilter = document.getElementById('roomFilter');
-    const roomCards = document.querySelectorAll('.room-card');
-    const allRooms = Array.from(roomCards).map(card => ({
-        full: card.dataset.room,
-        building: card.dataset.building
-    }));
-
-    function populateRoomFilter() {
-        roomFilter.innerHTML = '<option value="all">All Rooms</option>';
-        const filtered = allRooms.filter(r => 
-            buildingFilter.value === 'all' || r.building === buildingFilter.value
-        );
-        const unique = [...new Set(filtered.map(r => r.full))].sort();
-        unique.forEach(full => {
-            const opt = document.createElement('option');
-            opt.value = full;
-            opt.textContent = full;
-            roomFilter.appendChild(opt);
-        });
-    }
+    def generate_rooms_timetable(self):
+        self._write_report("rooms.html", self.render_rooms_timetable())
+        print("Rooms timetable saved as 'rooms.html'")
 
-    function applyFilters() {
-        const building = buildingFilter.value;
-        const room = roomFilter.value;
+    def input_hash(self) -> str:
+        """sha256 of the loaded input data alone."""
+        return hashlib.sha256(json.dumps(self._data_snapshot(), sort_keys=True).encode()).hexdigest()
+
+    def solution_metadata(self) -> dict:
+        """What the current timetable was solved from, recorded with the payload and saved state.
+
+        solve_key names the (solver version, input data, seed and solver configuration) it came
+        from; when deterministic is true, solving that again gives the same timetable. It is also
+        the key of solution_store, and from_cache tells whether the timetable was taken from there.
+        """
+        return {
+            "input_hash": self.input_hash(),
+            "seed": self.seed,
+            "config": self.solve_config,
+            "deterministic": self.deterministic,
+            "solve_key": self._solve_key(),
+            "from_cache": self.from_cache,
+            "version": self.solution_version(),
+        }
 
-        document.querySelectorAll('.building-card').forEach(card => {
-            card.style.display = 'none';
-        });
+    def solution_version(self) -> str:
+        """sha256 naming the loaded data together with the current assignments, e.g. as a cache key."""
+        rows = sorted((a.section_id, a.course_id, a.instructor_id, a.room_full_name, a.time_slot_id,
+                       a.session_type.value) for a in self.assignments)
+        return hashlib.sha256(json.dumps([self._data_snapshot(), rows], sort_keys=True).encode()).hexdigest()
+
+    def _report_digests(self):
+        # page -> sha256 of what it is drawn from. timetable.json is named by the solution version;
+        # the HTML pages are shells that do not depend on the data, so their digest is of the
+        # rendered text, covering both the markup and the inlined renderer
+        digests = {}
+        for page, (_, renderer) in self.REPORT_PAGES.items():
+            if page == "data":
+                source = self.solution_version()
+            else:
+                text = hashlib.sha256()
+                for chunk in getattr(self, renderer)():
+                    text.update(chunk.encode("utf-8"))
+                source = text.hexdigest()
+            digests[page] = hashlib.sha256(json.dumps([self.REPORT_VERSION, page, source]).encode()).hexdigest()
+        return digests
+
+    def generate_all_reports(self, only_changed: bool = False, manifest_path: str = ".report_manifest.json",
+                             workers: int = None):
+        """Render the report pages and their JSON payload concurrently.
+
+        The pages are independent, so they run in a thread pool; seconds per page land in
+        report_timings. Each page's data digest is kept in
+        manifest_path, and with only_changed a page whose digest and file are unchanged since the last
+        run is not redrawn. Returns the names of the pages rendered.
+        """
+        digests = self._report_digests()
+        previous = {}
+        if only_changed and manifest_path and os.path.exists(manifest_path):
+            try:
+                with open(manifest_path, encoding="utf-8") as f:
+                    previous = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f" Ignoring report manifest '{manifest_path}': {e}")
+        pages = [page for page, (filename, _) in self.REPORT_PAGES.items()
+                 if previous.get(page) != digests[page] or not os.path.exists(filename)]
+
+        def render(page):
+            filename, renderer = self.REPORT_PAGES[page]
+            started = time.perf_counter()
+            self._write_report(filename, getattr(self, renderer)())
+            return page, time.perf_counter() - started
+
+        self.report_timings = {}
+        if pages:
+            with self._timed("reports"), ThreadPoolExecutor(max_workers=workers or len(pages)) as pool:
+                for page, seconds in pool.map(render, pages):
+                    self.report_timings[page] = self.phase_timings[f"reports/{page}"] = seconds
+                    print(f" Rendered {self.REPORT_PAGES[page][0]} in {seconds:.3f}s")
+        for page, (filename, _) in self.REPORT_PAGES.items():
+            if page not in self.report_timings:
+                print(f" {filename} unchanged, not redrawn")
+        if manifest_path:
+            with open(manifest_path, "w", encoding="utf-8") as f:
+                json.dump(digests, f)
+        return pages
+
+
+class LocalSearch:
+    """Simulated annealing over the timetable held by a WebTimetableCSP.
+
+    Moves relocate a session to a free slot, swap two sessions of a section, swap a Kempe
+    chain between two slots, change room or instructor, and insert unplaced sessions by
+    ejecting whatever blocks them. Cost is UNPLACED_WEIGHT per unplaced session plus
+    WebTimetableCSP.soft_penalty; each move is scored only on the section-days and
+    instructors it touches.
+    """
+
+    UNPLACED_WEIGHT = 1000
+    MAX_CHAIN = 16
+
+    def __init__(self, system: "WebTimetableCSP", rng: random.Random):
+        self.system = system
+        self.rng = rng
+        self.sessions = system._build_sessions(system._required_sessions())
+        self.positions = system._slot_positions()
+        self.days = len({day for day, _ in self.positions.values()})
+        self.slot_ids = [ts.time_slot_id for ts in system.time_slots]
+
+        self.placed = [None] * len(self.sessions)
+        self.occupant = {}
+        self.section_days = {}
+        self.instructor_days = {}
+        self.instructor_totals = {}
+        self.instructor_outside = {}
+        self.by_section = {}
+        for j, sess in enumerate(self.sessions):
+            self.by_section.setdefault(sess.section.section_id, []).append(j)
+
+        # Take over the current assignments; anything not matching a required session stays fixed
+        open_sessions = {}
+        for j, sess in enumerate(self.sessions):
+            open_sessions.setdefault((sess.section.section_id, sess.course_id, sess.session_type), []).append(j)
+        self.fixed = []
+        current = system.assignments
+        system._reset_assignments()
+        for a in current:
+            candidates = open_sessions.get((a.section_id, a.course_id, a.session_type))
+            if candidates:
+                self._place(candidates.pop(0), a.instructor_id, a.room_full_name, a.time_slot_id)
+            else:
+                self.fixed.append(a)
+                system._add_assignment(a)
+        self.unplaced = {j for j, a in enumerate(self.placed) if a is None}
+
+    def _place(self, j: int, iid: str, room_name: str, tsid: str):
+        sess = self.sessions[j]
+        sid = sess.section.section_id
+        self.placed[j] = Assignment(sid, sess.course_id, iid, room_name, tsid, sess.session_type)
+        self.occupant[("s", sid, tsid)] = j
+        self.occupant[("i", iid, tsid)] = j
+        self.occupant[("r", room_name, tsid)] = j
+        bit = self.system.slot_bits[tsid]
+        self.system.section_masks[sid] = self.system.section_masks.get(sid, 0) | bit
+        self.system.instructor_masks[iid] = self.system.instructor_masks.get(iid, 0) | bit
+        self.system.room_masks[room_name] = self.system.room_masks.get(room_name, 0) | bit
+        day, pos = self.positions[tsid]
+        self.section_days.setdefault((sid, day), []).append(pos)
+        loads = self.instructor_days.setdefault(iid, {})
+        loads[day] = loads.get(day, 0) + 1
+        self.instructor_totals[iid] = self.instructor_totals.get(iid, 0) + 1
+        self.instructor_outside[iid] = self.instructor_outside.get(iid, 0) + self.system._outside_preference(iid, tsid)
+
+    def _unplace(self, j: int):
+        a = self.placed[j]
+        self.placed[j] = None
+        tsid = a.time_slot_id
+        del self.occupant[("s", a.section_id, tsid)]
+        del self.occupant[("i", a.instructor_id, tsid)]
+        del self.occupant[("r", a.room_full_name, tsid)]
+        clear = ~self.system.slot_bits[tsid]
+        self.system.section_masks[a.section_id] &= clear
+        self.system.instructor_masks[a.instructor_id] &= clear
+        self.system.room_masks[a.room_full_name] &= clear
+        day, pos = self.positions[tsid]
+        self.section_days[(a.section_id, day)].remove(pos)
+        self.instructor_days[a.instructor_id][day] -= 1
+        self.instructor_totals[a.instructor_id] -= 1
+        self.instructor_outside[a.instructor_id] -= self.system._outside_preference(a.instructor_id, tsid)
+
+    def _is_free(self, j: int, iid: str, room_name: str, tsid: str) -> bool:
+        return self.system._check_candidate(iid, room_name, self.sessions[j].section.section_id, tsid)
+
+    def _local_cost(self, section_days, instructors) -> int:
+        cost = 0
+        for key in section_days:
+            cost += WebTimetableCSP._day_gaps(self.section_days.get(key, []))
+        for iid in instructors:
+            loads = self.instructor_days.get(iid, {})
+            cost += WebTimetableCSP._day_overload(loads.values(), self.instructor_totals.get(iid, 0), self.days)
+            cost += self.instructor_outside.get(iid, 0)
+        return cost
+
+    def cost(self) -> int:
+        return (self.UNPLACED_WEIGHT * len(self.unplaced)
+                + self._local_cost(self.section_days, self.instructor_days))
+
+    def _try_move(self, removals, additions, temperature: float):
+        """Apply a move, score it incrementally and keep it per the Metropolis rule.
+
+        Returns the cost delta if the move was kept, None if it was invalid or rejected.
+        """
+        old = [(j, self.placed[j].instructor_id, self.placed[j].room_full_name, self.placed[j].time_slot_id)
+               for j in removals]
+        section_days, instructors = set(), set()
+        for j, iid, _, tsid in old + list(additions):
+            section_days.add((self.sessions[j].section.section_id, self.positions[tsid][0]))
+            instructors.add(iid)
+        before = self._local_cost(section_days, instructors)
+
+        for j in removals:
+            self._unplace(j)
+        applied = []
+        for move in additions:
+            if not self._is_free(*move):
+                break
+            self._place(*move)
+            applied.append(move[0])
+        else:
+            delta = (self._local_cost(section_days, instructors) - before
+                     + self.UNPLACED_WEIGHT * (len(removals) - len(additions)))
+            if delta <= 0 or (temperature > 0 and self.rng.random() < math.exp(-delta / temperature)):
+                self.unplaced.update(removals)
+                self.unplaced.difference_update(applied)
+                return delta
+
+        for j in applied:
+            self._unplace(j)
+        for move in old:
+            self._place(*move)
+        return None
+
+    def _random_free_bit(self, mask: int):
+        bits = [t for t in range(len(self.slot_ids)) if mask >> t & 1]
+        return self.slot_ids[self.rng.choice(bits)] if bits else None
+
+    def _propose(self):
+        """Pick a random move as (name, removals, additions), or None if it is a no-op."""
+        rng = self.rng
+        system = self.system
+        if self.unplaced and rng.random() < 0.3:
+            j = rng.choice(sorted(self.unplaced))
+            sess = self.sessions[j]
+            tsid = self._random_free_bit(system._slot_domain(sess))
+            if tsid is not None:
+                bit = system.slot_bits[tsid]
+                iid = rng.choice([i for i in sess.instructors if not system._instructor_busy(i) & bit])
+                room = rng.choice([r for r in sess.rooms if not system._blocked(system.room_masks.get(r.full_name, 0)) & bit])
+                return "insert", [], [(j, iid, room.full_name, tsid)]
+            if not sess.rooms:
+                return None
+            tsid = rng.choice(self.slot_ids)
+            iid = rng.choice(sess.instructors)
+            room = rng.choice(sess.rooms).full_name
+            blockers = {self.occupant.get(key) for key in
+                        (("s", sess.section.section_id, tsid), ("i", iid, tsid), ("r", room, tsid))}
+            blockers.discard(None)
+            return "eject", sorted(blockers), [(j, iid, room, tsid)]
+
+        if not self.placed:
+            return None
+        j = rng.randrange(len(self.placed))
+        a = self.placed[j]
+        if a is None:
+            return None
+        sess = self.sessions[j]
+        bit = system.slot_bits[a.time_slot_id]
+        kind = rng.random()
+        if kind < 0.35:
+            busy = (system._instructor_busy(a.instructor_id)
+                    | system._blocked(system.section_masks.get(a.section_id, 0) | system.room_masks.get(a.room_full_name, 0)))
+            tsid = self._random_free_bit(system.all_slots_mask & ~busy)
+            if tsid is None:
+                return None
+            return "relocate", [j], [(j, a.instructor_id, a.room_full_name, tsid)]
+        if kind < 0.55:
+            others = [k for k in self.by_section[a.section_id] if k != j and self.placed[k] is not None]
+            if not others:
+                return None
+            k = rng.choice(others)
+            b = self.placed[k]
+            return "swap", [j, k], [(j, a.instructor_id, a.room_full_name, b.time_slot_id),
+                                    (k, b.instructor_id, b.room_full_name, a.time_slot_id)]
+        if kind < 0.75:
+            return self._kempe_chain(j, rng.choice(self.slot_ids))
+        if kind < 0.88:
+            rooms = [r.full_name for r in sess.rooms
+                     if r.full_name != a.room_full_name and not system._blocked(system.room_masks.get(r.full_name, 0)) & bit]
+            if not rooms:
+                return None
+            return "room", [j], [(j, a.instructor_id, rng.choice(rooms), a.time_slot_id)]
+        instructors = [i for i in sess.instructors
+                       if i != a.instructor_id and not system._instructor_busy(i) & bit]
+        if not instructors:
+            return None
+        return "instructor", [j], [(j, rng.choice(instructors), a.room_full_name, a.time_slot_id)]
+
+    def _kempe_chain(self, j: int, other: str):
+        # Sessions in the two slots linked by a shared section or instructor must swap together
+        start = self.placed[j].time_slot_id
+        if other == start:
+            return None
+        swap_to = {start: other, other: start}
+        chain, frontier = {j}, [j]
+        while frontier:
+            m = frontier.pop()
+            a = self.placed[m]
+            target = swap_to[a.time_slot_id]
+            for key in (("s", a.section_id, target), ("i", a.instructor_id, target)):
+                k = self.occupant.get(key)
+                if k is not None and k not in chain:
+                    chain.add(k)
+                    frontier.append(k)
+            if len(chain) > self.MAX_CHAIN:
+                return None
+        removals = sorted(chain)
+        additions = [(m, self.placed[m].instructor_id, self.placed[m].room_full_name,
+                      swap_to[self.placed[m].time_slot_id]) for m in removals]
+        return "kempe", removals, additions
+
+    def run(self, time_limit: float, max_iterations: int = None,
+            start_temperature: float = 3.0, end_temperature: float = 0.05):
+        if not max_iterations and not (time_limit and time_limit > 0):
+            raise ValueError(f"time_limit must be positive when max_iterations is not set, got {time_limit}")
+        start = time.monotonic()
+        current = best = self.cost()
+        best_state = [(j, a.instructor_id, a.room_full_name, a.time_slot_id)
+                      for j, a in enumerate(self.placed) if a is not None]
+        trajectory = [(0, 0.0, current)]
+        accepted = {}
+        iteration = 0
+        while best > 0:
+            # With an iteration budget the temperature follows the iterations alone, so a run that
+            # completes them is reproducible, and time_limit only cuts it short; otherwise it follows the clock
+            elapsed = time.monotonic() - start
+            if time_limit and time_limit > 0 and elapsed >= time_limit:
+                break
+            if max_iterations:
+                if iteration >= max_iterations:
+                    break
+                progress = iteration / max_iterations
+            else:
+                progress = elapsed / time_limit
+            iteration += 1
+            if self.system.progress_callback is not None:
+                self.system._report_progress(phase="improve", iteration=iteration, cost=current, best_cost=best,
+                                             unplaced=len(self.unplaced))
+            temperature = start_temperature * (end_temperature / start_temperature) ** progress
+
+            move = self._propose()
+            if move is None:
+                continue
+            name, removals, additions = move
+            delta = self._try_move(removals, additions, temperature)
+            if delta is None:
+                continue
+            accepted[name] = accepted.get(name, 0) + 1
+            current += delta
+            if current < best:
+                best = current
+                best_state = [(j, a.instructor_id, a.room_full_name, a.time_slot_id)
+                              for j, a in enumerate(self.placed) if a is not None]
+                trajectory.append((iteration, round(time.monotonic() - start, 4), best))
+
+        for j, a in enumerate(self.placed):
+            if a is not None:
+                self._unplace(j)
+        for move in best_state:
+            self._place(*move)
+        self.unplaced = {j for j, a in enumerate(self.placed) if a is None}
+
+        self.system._reset_assignments()
+        for a in self.fixed + [a for a in self.placed if a is not None]:
+            self.system._add_assignment(a)
+        return {
+            "iterations": iteration,
+            "seconds": round(time.monotonic() - start, 4),
+            "initial_cost": trajectory[0][2],
+            "final_cost": best,
+            "unplaced": len(self.unplaced),
+            "accepted_moves": accepted,
+            "trajectory": trajectory,
+        }
 
-        roomCards.forEach(card => {
-            const cardBuilding = card.dataset.building;
-            const cardRoom = card.dataset.room;
 
-            let show = true;
-            if (building !== 'all' && cardBuilding !== building) show = false;
-            if (room !== 'all' && cardRoom !== room) show = false;
+_worker_system = None
 
-            card.style.display = show ? 'block' : 'none';
-            if (show) {
-                card.closest('.building-card').style.display = 'block';
-            }
-        });
-    }
 
-    buildingFilter.addEventListener('change', () => {
-        populateRoomFilter();
-        applyFilters();
-    });
-    roomFilter.addEventListener('change', applyFilters);
+def _init_multistart_worker(system: WebTimetableCSP):
+    global _worker_system
+    _worker_system = system
+    # Progress is reported by the parent as runs finish, profiling covers only the parent, and
+    # the parent alone consults the solution cache
+    if system.profiler is not None:
+        system.profiler.disable()
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    system.progress_callback = None
+    system.profiler = None
+    system.solution_store = None
 
-    populateRoomFilter();
-});
-</script>
-</body></html>
-"""
-        with open("rooms.html", "w", encoding="utf-8") as f:
-            f.write(html)
-        print("Rooms timetable saved as 'rooms.html'")
 
-    def generate_all_reports(self):
-        self.generate_main_timetable()
-        self.generate_professors_timetable()
-        self.generate_assistants_timetable()
-        self.generate_rooms_timetable()
+def _run_greedy_seed(seed: int):
+    with contextlib.redirect_stdout(io.StringIO()):
+        _worker_system.generate_timetable(seed=seed)
+    return seed, AssignmentTable.from_assignments(_worker_system.assignments), _worker_system.soft_penalty()
 
 
 if __name__ == "__main__":
-    system = WebTimetableCSP()
+    import argparse
+
+    def non_negative_seconds(text: str) -> float:
+        value = float(text)
+        if not value >= 0:
+            raise argparse.ArgumentTypeError(f"must be 0 or more seconds, got {text}")
+        return value
+
+    def positive_count(text: str) -> int:
+        value = int(text)
+        if value < 1:
+            raise argparse.ArgumentTypeError(f"must be at least 1, got {text}")
+        return value
+
+    parser = argparse.ArgumentParser(description="Generate the E-JUST timetable web pages.")
+    parser.add_argument("--solver", choices=sorted(WebTimetableCSP.SOLVERS), default="greedy")
+    parser.add_argument("--time-limit", type=float, default=60.0, help="search budget in seconds")
+    parser.add_argument("--restarts", type=positive_count, default=8, help="greedy runs for the multistart solver")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes or CP-SAT search workers (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed for every random choice of the solvers and the local search")
+    parser.add_argument("--improve", type=non_negative_seconds, default=0.0,
+                        help="seconds of local-search improvement after solving (0 to skip)")
+    parser.add_argument("--preferences", choices=["hard", "soft", "off"], default="soft",
+                        help="how instructors' preferred slots are honoured")
+    parser.add_argument("--incremental", action="store_true",
+                        help="keep still-valid assignments from the last run and only place what changed")
+    parser.add_argument("--state", default="timetable_state.json", help="where the last run's timetable is kept")
+    parser.add_argument("--only-changed", action="store_true",
+                        help="redraw only the report pages whose data changed since the last run")
+    parser.add_argument("--profile", choices=["cpu", "memory", "all"], default=None,
+                        help="run the phases under cProfile and/or tracemalloc")
+    parser.add_argument("--metrics", default=None, help="write phase timings and solver counters to this JSON file")
+    parser.add_argument("--solution-cache", default=".solution_cache.sqlite3",
+                        help="reuse solutions of the same input, seed and options from this file ('' to disable)")
+    parser.add_argument("--solution-cache-mb", type=float, default=64.0, help="size cap of the solution cache")
+    parser.add_argument("--fresh", action="store_true",
+                        help="solve again even when the solution cache has this configuration")
+    parser.add_argument("--unplaced", default=None,
+                        help="write the sessions left unplaced and their blockers to this .json or .csv file")
+    args = parser.parse_args()
+
+    system = WebTimetableCSP(preference_mode=args.preferences)
+    if args.profile:
+        system.enable_profiling(cpu=args.profile in ("cpu", "all"), memory=args.profile in ("memory", "all"))
+    if args.solution_cache:
+        system.solution_store = SolutionStore(args.solution_cache, int(args.solution_cache_mb * 2**20),
+                                              reuse=not args.fresh)
     system.load_data()
-    if system.generate_timetable():
-        system.generate_all_reports()
+    solver_options = dict(solver=args.solver, time_limit=args.time_limit,
+                          restarts=args.restarts, workers=args.workers, seed=args.seed)
+    if args.incremental:
+        generated = system.generate_timetable_incremental(args.state, **solver_options)
+    else:
+        generated = system.generate_timetable(**solver_options)
+    if generated:
+        if args.improve > 0:
+            system.improve_timetable(time_limit=args.improve, seed=args.seed)
+        system.save_state(args.state)
+        system.generate_all_reports(only_changed=args.only_changed)
         print("\nAll timetables generated! Open:")
         print("  - timetable.html      (Main)")
         print("  - professors.html     (Professors)")
         print("  - assistants.html     (Assistant Professors)")
         print("  - rooms.html          (Rooms)")
+        print("The pages load timetable.json, so serve this folder (python -m http.server) or run app.py.")
     else:
-        print("\nFailed to generate timetable.")
\ No newline at end of file
+        print("\nFailed to generate timetable.")
+
+    if args.unplaced:
+        print(f"{len(system.export_unplaced(args.unplaced))} unplaced sessions written to {args.unplaced}")
+    if args.metrics:
+        with open(args.metrics, "w", encoding="utf-8") as f:
+            json.dump(system.metrics(), f, indent=2)
+        print(f"Metrics written to {args.metrics}")
+    if args.profile:
+        print("\nPhase      seconds  traced peak")
+        for phase, seconds in system.phase_timings.items():
+            if "/" not in phase:
+                peak = system.memory_peaks.get(phase)
+                print(f" {phase:9} {seconds:8.3f}" + (f"  {peak / 2**20:8.1f} MB" if peak is not None else ""))
+        for row in system.profile_functions(15):
+            print(f" {row['cumulative_seconds']:9.3f}s {row['calls']:9} {row['function']}")
\ No newline at end of file
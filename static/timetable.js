@@ -0,0 +1,273 @@
+// Client-side renderer for the timetable pages.
+//
+// projeeeeeeect.py publishes the solution as one compact JSON payload (timetable.json, or
+// /api/timetable from app.py): lookup tables for days, slots, courses, instructors, rooms and
+// sections, plus assignments as rows of indexes into those tables. Each page fetches it once
+// and draws only the level, section, instructor or room picked in its filters.
+(function () {
+  'use strict';
+
+  const SPEC_NAMES = {
+    AID: 'Artificial Intelligence & Data Science',
+    CNC: 'Cybersecurity',
+    CSC: 'Computer Science',
+    BIF: 'Bioinformatics'
+  };
+  const ENTITIES = {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'};
+
+  function esc(text) {
+    return String(text).replace(/[&<>"']/g, c => ENTITIES[c]);
+  }
+
+  // The backend URL of config.js, unless it is unset or still the example placeholder
+  function apiBase() {
+    const base = (window.API_BASE || '').replace(/\/$/, '');
+    return /^https?:\/\/your-(backend|app)\.onrender\.com$/.test(base) ? '' : base;
+  }
+
+  function dataUrl(options) {
+    if (options.url) return options.url;
+    if (apiBase()) return apiBase() + '/api/timetable';
+    return 'timetable.json';
+  }
+
+  // Expand the index rows once and group them per section, instructor and room, then per day
+  function index(payload) {
+    const data = {
+      generated: payload.generated,
+      days: payload.days,
+      slots: payload.slots.map(([day, start, end]) => ({day, start, end})),
+      courses: payload.courses.map(([id, name]) => ({id, name})),
+      instructors: payload.instructors.map(([id, name, role]) => ({id, name, role: payload.roles[role]})),
+      rooms: payload.rooms.map(([name, building, space, capacity]) => ({name, building, space, capacity})),
+      sections: payload.sections.map(([id, level, specialization]) => ({id, level, specialization})),
+      bySection: new Map(),
+      byInstructor: new Map(),
+      byRoom: new Map()
+    };
+    // Rows arrive in slot order, so every per-day list is already sorted by start time
+    payload.assignments.forEach(([section, course, instructor, room, slot, type]) => {
+      const a = {
+        section: data.sections[section],
+        course: data.courses[course],
+        instructor: data.instructors[instructor],
+        room: data.rooms[room],
+        slot: slot,
+        type: payload.types[type]
+      };
+      [[data.bySection, a.section.id], [data.byInstructor, a.instructor.id], [data.byRoom, a.room.name]]
+        .forEach(([groups, key]) => {
+          if (!groups.has(key)) groups.set(key, data.days.map(() => []));
+          groups.get(key)[data.slots[slot].day].push(a);
+        });
+    });
+    return data;
+  }
+
+  function fetchPayload(url) {
+    return fetch(url).then(response => {
+      // app.py answers 503 while a worker solves its first timetable; ask again when it says to
+      if (response.status === 503 && response.headers.has('Retry-After')) {
+        const seconds = Number(response.headers.get('Retry-After')) || 5;
+        return new Promise(resolve => setTimeout(resolve, seconds * 1000)).then(() => fetchPayload(url));
+      }
+      if (!response.ok) throw new Error('HTTP ' + response.status);
+      return response.json();
+    });
+  }
+
+  function load(options) {
+    return fetchPayload(dataUrl(options || {})).then(payload => {
+      const generated = document.getElementById('generatedOn');
+      if (generated && payload.generated) generated.textContent = payload.generated;
+      return index(payload);
+    });
+  }
+
+  function showError(container, error) {
+    container.innerHTML = '<div class="empty">Could not load the timetable: ' + esc(error.message) + '</div>';
+    console.error('Timetable data failed to load:', error);
+  }
+
+  function fillSelect(select, options) {
+    const current = select.value;
+    select.length = 1;  // keep the "all" option
+    options.forEach(([value, label]) => select.add(new Option(label, value)));
+    select.value = current;
+    if (select.selectedIndex < 0) select.value = 'all';
+  }
+
+  function sectionNumber(id) {
+    return id.split('_')[0].substring(1);
+  }
+
+  function byName(a, b) {
+    return a.name < b.name ? -1 : a.name > b.name ? 1 : (a.id < b.id ? -1 : 1);
+  }
+
+  function weekHtml(data, perDay, emptyText, line) {
+    let html = '<div class="days-container">';
+    data.days.forEach((day, d) => {
+      html += `<div class="day-card"><div class="day-header">${esc(day)}</div>`;
+      const list = perDay ? perDay[d] : [];
+      if (!list.length) html += `<div class="empty">${emptyText}</div>`;
+      list.forEach(a => {
+        const slot = data.slots[a.slot];
+        html += `<div class="assignment ${a.type.toLowerCase()}">` +
+          `<span class="course-title">${esc(a.course.name)} (${esc(a.course.id)})</span>` +
+          `<span class="details">${esc(slot.start)} – ${esc(slot.end)}<br>${line(a)}<br>` +
+          `📍 ${esc(a.room.name)}<br>📘 ${esc(a.type)}</span></div>`;
+      });
+      html += '</div>';
+    });
+    return html + '</div>';
+  }
+
+  // Main page: level, specialization and section filters over section cards
+  function mountSections(container, options) {
+    options = options || {};
+    const levelTitle = options.levelTitle || (level => 'Level ' + level);
+    const levelFilter = document.getElementById('levelFilter');
+    const specFilter = document.getElementById('specializationFilter');
+    const sectionFilter = document.getElementById('sectionFilter');
+
+    return load(options).then(data => {
+      const scheduled = data.sections.filter(s => data.bySection.has(s.id));
+      const matches = s => (levelFilter.value === 'all' || s.level === levelFilter.value) &&
+        (specFilter.value === 'all' || s.specialization === specFilter.value);
+
+      function populateSectionFilter() {
+        fillSelect(sectionFilter, scheduled.filter(matches).map(s => [s.id, 'Section ' + sectionNumber(s.id)]));
+      }
+
+      function render() {
+        let html = '';
+        let level = null;
+        scheduled.filter(s => matches(s) && (sectionFilter.value === 'all' || s.id === sectionFilter.value)).forEach(s => {
+          if (s.level !== level) {
+            if (level !== null) html += '</div>';
+            html += `<div class="level-card" data-level="${esc(s.level)}"><div class="level-header">${esc(levelTitle(s.level))}</div>`;
+            level = s.level;
+          }
+          const spec = SPEC_NAMES[s.specialization] || s.specialization;
+          html += `<div class="section-card" data-section="${esc(s.id)}" data-specialization="${esc(s.specialization)}">` +
+            `<div class="section-header">Section ${esc(sectionNumber(s.id))} — ${esc(spec)}</div>` +
+            weekHtml(data, data.bySection.get(s.id), 'No classes', a => '👨‍🏫 ' + esc(a.instructor.name)) + '</div>';
+        });
+        if (level !== null) html += '</div>';
+        container.innerHTML = html || '<div class="empty">No sections match these filters</div>';
+      }
+
+      // Open on the first level rather than drawing every section of the faculty
+      if (levelFilter.value === 'all' && scheduled.length) levelFilter.value = scheduled[0].level;
+      levelFilter.addEventListener('change', () => { populateSectionFilter(); render(); });
+      specFilter.addEventListener('change', () => { populateSectionFilter(); render(); });
+      sectionFilter.addEventListener('change', render);
+      populateSectionFilter();
+      render();
+      return data;
+    }).catch(error => showError(container, error));
+  }
+
+  // Professors and assistants pages: one weekly card per instructor of options.role
+  function mountInstructors(container, options) {
+    const kind = options.cardClass;
+    const select = document.getElementById(options.filter);
+
+    return load(options).then(data => {
+      const people = data.instructors
+        .filter(i => i.role === options.role && !(options.hideUnknown && i.name === 'Unknown Instructor'))
+        .sort(byName);
+      fillSelect(select, people.map(i => [i.id, i.name]));
+
+      function render() {
+        container.innerHTML = people
+          .filter(i => data.byInstructor.has(i.id) && (select.value === 'all' || i.id === select.value))
+          .map(i => `<div class="${kind}-card" data-${kind}="${esc(i.id)}" style="display: block">` +
+            `<div class="${kind}-header">${esc(i.name)}</div>` +
+            weekHtml(data, data.byInstructor.get(i.id), 'Free', a => '👥 ' + esc(a.section.id)) + '</div>')
+          .join('');
+      }
+
+      if (select.value === 'all') {
+        const first = people.find(i => data.byInstructor.has(i.id));
+        if (first) select.value = first.id;
+      }
+      select.addEventListener('change', render);
+      render();
+      return data;
+    }).catch(error => showError(container, error));
+  }
+
+  // Rooms page: every slot of the week per room, free or with its occupant
+  function mountRooms(container, options) {
+    options = options || {};
+    const buildingFilter = document.getElementById('buildingFilter');
+    const roomFilter = document.getElementById('roomFilter');
+
+    return load(options).then(data => {
+      const slotsByDay = data.days.map(() => []);
+      data.slots.forEach((slot, t) => slotsByDay[slot.day].push(t));
+      const buildings = [...new Set(data.rooms.map(r => r.building))].sort();
+      fillSelect(buildingFilter, buildings.map(b => [b, b]));
+
+      function populateRoomFilter() {
+        const names = data.rooms
+          .filter(r => buildingFilter.value === 'all' || r.building === buildingFilter.value)
+          .map(r => r.name).sort();
+        fillSelect(roomFilter, names.map(name => [name, name]));
+      }
+
+      function roomHtml(room) {
+        const perDay = data.byRoom.get(room.name);
+        let html = `<div class="room-card" data-room="${esc(room.name)}" data-building="${esc(room.building)}" style="display: block">` +
+          `<div class="room-header">${esc(room.space)} (${room.capacity} seats)</div><div class="days-container">`;
+        data.days.forEach((day, d) => {
+          html += `<div class="day-card"><div class="day-header">${esc(day)}</div>`;
+          if (!slotsByDay[d].length) html += '<div class="free">No schedule</div>';
+          // One occupant per room slot, the first listed
+          const occupants = new Map();
+          (perDay ? perDay[d] : []).forEach(a => { if (!occupants.has(a.slot)) occupants.set(a.slot, a); });
+          slotsByDay[d].forEach(t => {
+            const slot = data.slots[t];
+            const a = occupants.get(t);
+            html += a
+              ? `<div class="occupied">${esc(slot.start)} – ${esc(slot.end)}<br>${esc(a.course.name)} (${esc(a.course.id)})<br>` +
+                `👨‍🏫 ${esc(a.instructor.name)} | 👥 ${esc(a.section.id)}</div>`
+              : `<div class="free">${esc(slot.start)} – ${esc(slot.end)} — FREE</div>`;
+          });
+          html += '</div>';
+        });
+        return html + '</div></div>';
+      }
+
+      function render() {
+        let html = '';
+        let building = null;
+        data.rooms
+          .filter(r => (buildingFilter.value === 'all' || r.building === buildingFilter.value) &&
+            (roomFilter.value === 'all' || r.name === roomFilter.value))
+          .forEach(room => {
+            if (room.building !== building) {
+              if (building !== null) html += '</div>';
+              html += `<div class="building-card" data-building="${esc(room.building)}" style="display: block">` +
+                `<div class="building-header">${esc(room.building)}</div>`;
+              building = room.building;
+            }
+            html += roomHtml(room);
+          });
+        if (building !== null) html += '</div>';
+        container.innerHTML = html;
+      }
+
+      if (buildingFilter.value === 'all' && buildings.length) buildingFilter.value = buildings[0];
+      buildingFilter.addEventListener('change', () => { populateRoomFilter(); render(); });
+      roomFilter.addEventListener('change', render);
+      populateRoomFilter();
+      render();
+      return data;
+    }).catch(error => showError(container, error));
+  }
+
+  window.Timetable = {apiBase, load, mountSections, mountInstructors, mountRooms};
+})();
@@ -0,0 +1,95 @@
+"""Fixtures writing small timetabling instances to a temporary working directory."""
+import csv
+import os
+import shutil
+import sys
+
+import pandas as pd
+import pytest
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from projeeeeeeect import WebTimetableCSP  # noqa: E402
+
+# Slots partially overlapping the sample week's Sunday and Monday slots
+OVERLAPPING_SLOTS = [
+    ("Sunday", "10:00 AM", "11:30 AM", "TSX1"),
+    ("Monday", "9:30 AM", "12:00 PM", "TSX2"),
+    ("Tuesday", "1:00 PM", "2:30 PM", "TSX3"),
+]
+
+
+def write_instance(directory, slots, instructors, sections, courses, rooms):
+    """Write the five input files. courses are (id, lecture, tutorial, lab) and rooms (space, capacity, type)."""
+    for name, header, rows in (
+        ("TimeSlots.csv", ["Day", "StartTime", "EndTime", "TimeSlotID"], slots),
+        ("Instructor.csv", ["InstructorID", "Name", "Role", "PreferredSlots", "QualifiedCourses"], instructors),
+        ("Sections.csv", ["SectionID", "StudentCount", "Courses"], sections),
+    ):
+        with open(os.path.join(directory, name), "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+    yes_no = {True: "Yes", False: "No"}
+    pd.DataFrame([(cid, f"Course {cid}", 3, yes_no[lec], yes_no[tut], yes_no[lab]) for cid, lec, tut, lab in courses],
+                 columns=["CourseID", "CourseName", "Credits", "Lecture", "Tutorial", "Lab"]
+                 ).to_excel(os.path.join(directory, "courses_edited.xlsx"), index=False)
+    pd.DataFrame([("B1", space, capacity, kind) for space, capacity, kind in rooms],
+                 columns=["Bulding", "Space", "Capacity", "Type"]
+                 ).to_excel(os.path.join(directory, "Bulding.xlsx"), index=False)
+
+
+def load(preference_mode: str = "soft") -> WebTimetableCSP:
+    system = WebTimetableCSP(preference_mode=preference_mode)
+    system.load_data()
+    return system
+
+
+def clashes(system: WebTimetableCSP) -> list:
+    """Pairs of assignments sharing an instructor, room or section in the same or overlapping slots."""
+    found = []
+    for k, a in enumerate(system.assignments):
+        for b in system.assignments[k + 1:]:
+            if (system.slot_conflicts[a.time_slot_id] & system.slot_bits[b.time_slot_id]
+                    and (a.instructor_id == b.instructor_id or a.room_full_name == b.room_full_name
+                         or a.section_id == b.section_id)):
+                found.append((a, b))
+    return found
+
+
+@pytest.fixture
+def sample_dir(tmp_path, monkeypatch):
+    """The EJUST sample input files."""
+    for name, _ in WebTimetableCSP.INPUT_FILES:
+        shutil.copy(os.path.join(REPO, name), tmp_path)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def overlap_dir(sample_dir):
+    """The sample with a few extra slots partially overlapping its own."""
+    with open("TimeSlots.csv", "a", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows(OVERLAPPING_SLOTS)
+    return sample_dir
+
+
+@pytest.fixture
+def tight_dir(tmp_path, monkeypatch):
+    """Three lectures of one section where greedy, taking C2 first, gives Dr. One's only slot away.
+
+    Dr. One teaches only on Sunday, which has one slot, and is the only one qualified for C1.
+    """
+    write_instance(
+        tmp_path,
+        slots=[("Sunday", "9:00 AM", "10:30 AM", "TS0"), ("Monday", "9:00 AM", "10:30 AM", "TS1"),
+               ("Monday", "10:45 AM", "12:15 PM", "TS2"), ("Tuesday", "9:00 AM", "10:30 AM", "TS3")],
+        instructors=[("P1", "Dr. One", "Professor", "Only on Sunday", "C2,C1"),
+                     ("P2", "Dr. Two", "Professor", "Any time", "C2,C3")],
+        sections=[("S1_L1", 20, "C2,C1,C3")],
+        courses=[("C1", True, False, False), ("C2", True, False, False), ("C3", True, False, False)],
+        rooms=[("F0.01", 50, "Lecture")],
+    )
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
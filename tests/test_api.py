@@ -0,0 +1,88 @@
+import time
+
+import pytest
+
+import app as api
+
+
+@pytest.fixture
+def client(sample_dir, monkeypatch):
+    monkeypatch.setattr(api, "JOBS_DB", str(sample_dir / "jobs.sqlite3"))
+    monkeypatch.setattr(api, "SOLUTION_CACHE", str(sample_dir / "solutions.sqlite3"))
+    monkeypatch.setattr(api, "STATE_PATH", str(sample_dir / "timetable_state.json"))
+    monkeypatch.setattr(api, "_solutions", api.OrderedDict())
+    monkeypatch.setattr(api, "_current", None)
+    monkeypatch.setattr(api, "_published_checked", 0.0)
+    return api.app.test_client()
+
+
+def ready(client, url, timeout=60):
+    # The first read starts the background solve and gets a 503 until it is done
+    deadline = time.monotonic() + timeout
+    while True:
+        response = client.get(url)
+        if response.status_code != 503:
+            return response
+        assert response.headers["Retry-After"] == str(api.SOLVING_RETRY_SECONDS)
+        assert time.monotonic() < deadline, "timetable never solved"
+        time.sleep(0.1)
+
+
+@pytest.mark.parametrize("url", ["/api/timetable", "/api/sections", "/api/rooms"])
+@pytest.mark.parametrize("encoding", ["identity", "gzip"])
+def test_matching_etag_is_not_modified(client, url, encoding):
+    headers = {"Accept-Encoding": encoding}
+    ready(client, url)
+    first = client.get(url, headers=headers)
+    assert first.status_code == 200
+    assert first.headers["ETag"].startswith('W/"')
+
+    second = client.get(url, headers={**headers, "If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 304
+    assert second.data == b""
+    assert second.headers["X-Timetable-Version"] == first.headers["X-Timetable-Version"]
+
+    other = client.get(url, headers={**headers, "If-None-Match": 'W/"stale"'})
+    assert other.status_code == 200
+
+
+def test_last_modified_is_the_same_after_a_restart(client, monkeypatch):
+    first = ready(client, "/api/timetable")
+    # Another worker solving the same version serves the time it was first published
+    monkeypatch.setattr(api, "_solutions", api.OrderedDict())
+    monkeypatch.setattr(api, "_current", None)
+    time.sleep(1.1)
+    second = ready(client, "/api/timetable")
+    assert second.headers["X-Timetable-Version"] == first.headers["X-Timetable-Version"]
+    assert second.headers["Last-Modified"] == first.headers["Last-Modified"]
+
+
+@pytest.mark.parametrize("options", [
+    {"nonsense": 1},
+    {"solver": "simplex"},
+    {"preferences": "always"},
+    {"solver": 1},
+    {"time_limit": "10"},
+    {"time_limit": True},
+    {"restarts": True},
+    {"seed": False},
+    {"publish": 1},
+    {"restarts": 2.5},
+    {"time_limit": 0},
+    {"time_limit": -5},
+    {"time_limit": 1e9},
+    {"improve": -1},
+    {"improve": 1e9},
+    {"restarts": 0},
+    {"restarts": 10**9},
+    {"workers": 0},
+    {"workers": 10**6},
+    {"seed": -1},
+    {"seed": 2**31},
+])
+def test_solve_rejects_bad_options(client, options):
+    response = client.post("/api/solve", json=options)
+    assert response.status_code == 400
+    # Rejected up front: no job was recorded
+    with api.contextlib.closing(api.jobs_db()) as db:
+        assert db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0] == 0
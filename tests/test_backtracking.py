@@ -0,0 +1,28 @@
+import csv
+
+from conftest import clashes, load
+
+
+def test_backtracking_completes_what_greedy_cannot(tight_dir):
+    greedy = load("hard")
+    greedy.generate_timetable(solver="greedy")
+    assert len(greedy.assignments) == 2
+
+    system = load("hard")
+    system.generate_timetable(solver="backtracking", time_limit=10)
+    assert len(system.assignments) == 3
+    assert not clashes(system)
+    assert system.solver_stats["pruned_values"] > 0
+
+
+def test_unplaceable_session_does_not_exhaust_the_search(tight_dir):
+    # A second section also needs Dr. One's single Sunday slot for C1: one of the two C1
+    # lectures can never be placed, which the search should settle by leaving it out
+    with open("Sections.csv", "a", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerow(["S2_L1", 20, "C1,C3"])
+    system = load("hard")
+    system.generate_timetable(solver="backtracking", time_limit=30)
+    assert not system.solver_stats["timed_out"]
+    assert system.solver_stats["unplaced"] == 1
+    assert len(system.assignments) == 4
+    assert not clashes(system)
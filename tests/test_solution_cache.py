@@ -0,0 +1,79 @@
+import csv
+
+import pytest
+
+import projeeeeeeect
+from conftest import load
+from projeeeeeeect import SolutionStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SolutionStore(str(tmp_path / "solutions.sqlite3"))
+
+
+def solve(store, preference_mode="soft", **options):
+    system = load(preference_mode)
+    system.solution_store = store
+    system.generate_timetable(**options)
+    return system
+
+
+def rows(system):
+    return sorted((a.section_id, a.course_id, a.instructor_id, a.room_full_name, a.time_slot_id)
+                  for a in system.assignments)
+
+
+def test_same_input_seed_and_options_hit(sample_dir, store):
+    first = solve(store, seed=1)
+    assert not first.from_cache
+    second = solve(store, seed=1)
+    assert second.from_cache
+    assert rows(second) == rows(first)
+    assert second.solution_version() == first.solution_version()
+
+
+def test_options_the_solver_ignores_still_hit(sample_dir, store):
+    solve(store, solver="greedy", time_limit=5)
+    assert solve(store, solver="greedy", time_limit=50, restarts=3).from_cache
+
+
+@pytest.mark.parametrize("changed", [
+    {"seed": 2},
+    {"solver": "multistart", "restarts": 2, "workers": 1},
+    {"preference_mode": "hard"},
+])
+def test_seed_solver_or_options_change_misses(sample_dir, store, changed):
+    solve(store, seed=1)
+    options = {"seed": 1, **changed}
+    assert not solve(store, **options).from_cache
+
+
+def test_used_option_change_misses(sample_dir, store):
+    solve(store, solver="multistart", restarts=2, workers=1)
+    assert not solve(store, solver="multistart", restarts=3, workers=1).from_cache
+    assert solve(store, solver="multistart", restarts=3, workers=2).from_cache
+
+
+def test_input_change_misses(sample_dir, store):
+    solve(store)
+    with open("Sections.csv", newline="", encoding="utf-8") as f:
+        sections = list(csv.reader(f))
+    sections[1][1] = str(int(sections[1][1]) + 1)
+    with open("Sections.csv", "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows(sections)
+    assert not solve(store).from_cache
+
+
+def test_solver_version_change_misses(sample_dir, store, monkeypatch):
+    solve(store)
+    monkeypatch.setattr(projeeeeeeect.WebTimetableCSP, "SOLVER_VERSION",
+                        projeeeeeeect.WebTimetableCSP.SOLVER_VERSION + 1)
+    assert not solve(store).from_cache
+    assert solve(store).from_cache
+
+
+def test_reuse_false_always_solves(sample_dir, store):
+    solve(store)
+    store.reuse = False
+    assert not solve(store).from_cache
@@ -0,0 +1,24 @@
+import pytest
+
+from conftest import clashes, load
+from projeeeeeeect import WebTimetableCSP
+
+OPTIONS = {"greedy": {}, "backtracking": {"time_limit": 10}, "multistart": {"restarts": 4, "workers": 2},
+           "cpsat": {"time_limit": 5, "workers": 4}}
+
+
+@pytest.mark.parametrize("preference_mode", ["soft", "hard"])
+@pytest.mark.parametrize("solver", sorted(WebTimetableCSP.SOLVERS))
+@pytest.mark.parametrize("data", ["sample_dir", "overlap_dir"])
+def test_solver_output_is_clash_free(request, data, solver, preference_mode):
+    request.getfixturevalue(data)
+    system = load(preference_mode)
+    system.generate_timetable(solver=solver, **OPTIONS[solver])
+    assert system.assignments
+    assert not clashes(system)
+    # Every placement is a session the input requires, placed at most once
+    required = {(section.section_id, course_id, session_type)
+                for section, course_id, session_type in system._required_sessions()}
+    placed = [(a.section_id, a.course_id, a.session_type) for a in system.assignments]
+    assert set(placed) <= required
+    assert len(placed) == len(set(placed))